@@ -1,3 +1,5 @@
+import os
+
 from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
@@ -39,6 +41,9 @@ def create_app():
     db.init_app(app)
     with app.app_context():
         db.create_all()
+        # create_all never alters existing tables; apply the one-off
+        # column additions for databases created before them.
+        models.assistant_models.ensure_assistant_schema()
     JWTManager(app)
 
     app.register_blueprint(auth_bp)
@@ -46,6 +51,27 @@ def create_app():
     app.register_blueprint(statements_bp)
     app.register_blueprint(assistant_bp)
 
+    # Warm the categorization pipeline (ML model load/train, merchant DB,
+    # taxonomy prompt) at startup so the first request after a worker
+    # restart doesn't pay the several-hundred-ms cold start.  Skippable for
+    # tooling that imports the app without needing the pipeline.
+    if os.getenv("PIPELINE_WARMUP", "1") == "1":
+        from categorization.pipeline_service import get_pipeline
+        from llm_providers import _taxonomy_summary
+
+        with app.app_context():
+            # ensure_loaded: the ML model is lazy-loaded on first predict,
+            # so warm it explicitly here.
+            get_pipeline().categorizer.ml.ensure_loaded()
+            _taxonomy_summary()
+
+    # Optional: background worker that flushes deferred LLM jobs through the
+    # provider's Batch API (see assistant/batch.py).
+    if os.getenv("LLM_BATCH_ENABLED") == "1":
+        from assistant.batch import start_batch_worker
+
+        start_batch_worker(app)
+
     return app
 
 
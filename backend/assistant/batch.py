@@ -0,0 +1,174 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from models import db
+from models.assistant_models import LLMBatchJob
+
+from .llm_service import _get_client, _model_name
+
+# Deferred processing of non-interactive prompts through the OpenAI-compatible
+# Batch API (DeepSeek exposes the same file-based endpoint).  Batched requests
+# cost ~50% of the synchronous price and are fine for anything generated on a
+# schedule rather than while the user waits.
+#
+# Lifecycle: enqueue_report() inserts a pending row; submit_pending_jobs()
+# flushes pending rows as one JSONL batch; poll_submitted_jobs() copies
+# finished completions back into LLMBatchJob.response.  The optional worker
+# thread runs both every BATCH_POLL_SECONDS.
+
+BATCH_POLL_SECONDS = int(os.getenv("LLM_BATCH_POLL_SECONDS", "600"))
+
+
+def enqueue_report(user_id: int, prompt: str, kind: str, system: str | None = None) -> LLMBatchJob:
+    """Queue a prompt for batched processing and return the job row."""
+    job = LLMBatchJob(user_id=user_id, kind=kind, prompt=prompt, system=system)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def _job_messages(job: LLMBatchJob) -> list:
+    messages = []
+    if job.system:
+        messages.append({"role": "system", "content": job.system})
+    messages.append({"role": "user", "content": job.prompt})
+    return messages
+
+
+def submit_pending_jobs() -> int:
+    """Bundle all pending jobs into one Batch API submission.
+
+    Returns the number of jobs submitted (0 when queue empty or no API key).
+    """
+    client = _get_client()
+    if client is None:
+        return 0
+
+    jobs = LLMBatchJob.query.filter_by(status="pending").all()
+    if not jobs:
+        return 0
+
+    model_name = _model_name()
+    lines = []
+    for job in jobs:
+        lines.append(json.dumps({
+            "custom_id": str(job.id),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": model_name,
+                "messages": _job_messages(job),
+                "temperature": 0.1,
+                "max_tokens": 1024,
+            },
+        }))
+
+    tf = tempfile.NamedTemporaryFile(
+        mode="w", suffix=".jsonl", delete=False, encoding="utf-8"
+    )
+    try:
+        tf.write("\n".join(lines))
+        tf.close()
+        with open(tf.name, "rb") as fh:
+            batch_file = client.files.create(file=fh, purpose="batch")
+        batch = client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+    except Exception as e:
+        for job in jobs:
+            job.status = "failed"
+            job.error = str(e)
+        db.session.commit()
+        return 0
+    finally:
+        try:
+            os.remove(tf.name)
+        except OSError:
+            pass
+
+    for job in jobs:
+        job.status = "submitted"
+        job.provider_batch_id = batch.id
+    db.session.commit()
+    return len(jobs)
+
+
+def poll_submitted_jobs() -> int:
+    """Check submitted batches and write finished completions back.
+
+    Returns the number of jobs completed in this pass.
+    """
+    client = _get_client()
+    if client is None:
+        return 0
+
+    submitted = LLMBatchJob.query.filter_by(status="submitted").all()
+    if not submitted:
+        return 0
+
+    by_batch: dict = {}
+    for job in submitted:
+        by_batch.setdefault(job.provider_batch_id, []).append(job)
+
+    done = 0
+    for batch_id, jobs in by_batch.items():
+        try:
+            batch = client.batches.retrieve(batch_id)
+        except Exception:
+            continue
+        if batch.status in ("failed", "expired", "cancelled"):
+            for job in jobs:
+                job.status = "failed"
+                job.error = f"batch {batch.status}"
+            continue
+        if batch.status != "completed" or not batch.output_file_id:
+            continue
+        try:
+            content = client.files.content(batch.output_file_id).text
+        except Exception:
+            continue
+        results = {}
+        for line in content.splitlines():
+            try:
+                row = json.loads(line)
+                body = (row.get("response") or {}).get("body") or {}
+                text = body["choices"][0]["message"]["content"]
+                results[row.get("custom_id")] = (text or "").strip()
+            except Exception:
+                continue
+        for job in jobs:
+            text = results.get(str(job.id))
+            if text is None:
+                job.status = "failed"
+                job.error = "missing result in batch output"
+            else:
+                job.status = "done"
+                job.response = text
+                job.completed_at = datetime.utcnow()
+                done += 1
+    db.session.commit()
+    return done
+
+
+def start_batch_worker(app) -> threading.Thread:
+    """Start the background thread that flushes and polls the batch queue."""
+
+    def _loop():
+        while True:
+            with app.app_context():
+                try:
+                    submit_pending_jobs()
+                    poll_submitted_jobs()
+                except Exception:
+                    db.session.rollback()
+            time.sleep(BATCH_POLL_SECONDS)
+
+    t = threading.Thread(target=_loop, name="llm-batch-worker", daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+# Micro-batching dispatch layer for interactive LLM calls.
+#
+# Under concurrent user load each Flask worker thread used to hold its own
+# blocking round-trip to the provider.  This client funnels all prompts
+# through one background event loop: pending requests are drained from a
+# queue every few milliseconds, grouped into bins by max_tokens (so a 256-
+# token anomaly blurb is never stuck behind a 1024-token report in the same
+# dispatch wave), and flown concurrently over the shared keep-alive pool.
+#
+# DeepSeek's hosted chat API has no multi-prompt completion endpoint, so
+# "batch" here means coalesced concurrent dispatch rather than a single
+# fused forward pass; the provider's own continuous batching does the rest
+# server-side.  Enable per-process with LLM_BATCH_CLIENT=1.
+
+_MAX_BATCH = int(os.getenv("LLM_BATCH_MAX_SIZE", "16"))
+_WINDOW_MS = float(os.getenv("LLM_BATCH_WINDOW_MS", "5"))
+
+
+class LLMBatchClient:
+    """Queue prompts from any thread; a dedicated loop batches the sends."""
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._started = threading.Event()
+        self._start_lock = threading.Lock()
+
+    # -- lifecycle -----------------------------------------------------
+
+    def _ensure_started(self) -> None:
+        if self._started.is_set():
+            return
+        with self._start_lock:
+            if self._started.is_set():
+                return
+            t = threading.Thread(target=self._run_loop, name="llm-batch-client", daemon=True)
+            t.start()
+            self._started.wait()
+
+    def _run_loop(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        self._loop.call_soon(lambda: self._loop.create_task(self._dispatcher()))
+        self._started.set()
+        self._loop.run_forever()
+
+    # -- submission ----------------------------------------------------
+
+    def submit(self, prompt: str, *, system=None, temperature=0.1, max_tokens=512) -> str:
+        """Thread-safe blocking submit; returns the model's reply."""
+        self._ensure_started()
+        fut: Future = Future()
+        item = ({"prompt": prompt, "system": system, "temperature": temperature,
+                 "max_tokens": max_tokens}, fut)
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+        return fut.result()
+
+    # -- dispatch ------------------------------------------------------
+
+    async def _dispatcher(self) -> None:
+        while True:
+            item = await self._queue.get()
+            batch = [item]
+            # Linger briefly so concurrent requests can join this wave.
+            await asyncio.sleep(_WINDOW_MS / 1000.0)
+            while len(batch) < _MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            # Bin by max_tokens so short generations are dispatched together
+            # and never wait on the longest item in the wave.
+            bins: dict = {}
+            for kwargs, fut in batch:
+                bins.setdefault(kwargs["max_tokens"], []).append((kwargs, fut))
+            for _mt, items in sorted(bins.items()):
+                asyncio.ensure_future(self._fly_bin(items))
+
+    async def _fly_bin(self, items) -> None:
+        from .llm_service import ask_async
+
+        async def _one(kwargs, fut: Future) -> None:
+            try:
+                fut.set_result(await ask_async(kwargs["prompt"],
+                                               system=kwargs["system"],
+                                               temperature=kwargs["temperature"],
+                                               max_tokens=kwargs["max_tokens"]))
+            except Exception as e:
+                fut.set_exception(e)
+
+        await asyncio.gather(*(_one(k, f) for k, f in items))
+
+
+batch_client = LLMBatchClient()
+
+
+def batching_enabled() -> bool:
+    return os.getenv("LLM_BATCH_CLIENT") == "1"
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Small TTL + LRU cache for LLM completions.  `ask()` runs with a low
+# temperature, so identical prompts produce effectively identical answers;
+# caching them skips a full HTTPS round-trip (and its token cost) on every
+# repeat call.  Backed by an in-process OrderedDict by default; set
+# LLM_CACHE_URL to a redis:// URL to share the cache across workers.
+
+
+def make_key(
+    model: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    system: Optional[str] = None,
+) -> str:
+    """Stable cache key over everything that affects the completion."""
+    payload = json.dumps(
+        {"m": model, "p": prompt, "t": temperature, "mx": max_tokens, "s": system},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Thread-safe LRU cache with per-entry TTL and hit/miss counters."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: int = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._redis = self._init_redis()
+
+    @staticmethod
+    def _init_redis():
+        url = os.getenv("LLM_CACHE_URL")
+        if not url:
+            return None
+        try:
+            import redis
+
+            return redis.Redis.from_url(url)
+        except Exception:
+            # Missing package or unreachable server: silently fall back to
+            # the in-memory cache rather than break LLM features.
+            return None
+
+    def get(self, key: str) -> Optional[str]:
+        if self._redis is not None:
+            try:
+                value = self._redis.get("llm:" + key)
+                if value is not None:
+                    with self._lock:
+                        self._hits += 1
+                    return value.decode("utf-8")
+            except Exception:
+                pass
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+            self._misses += 1
+            return None
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        ttl = ttl if ttl is not None else self.ttl_seconds
+        if self._redis is not None:
+            try:
+                self._redis.setex("llm:" + key, ttl, value)
+            except Exception:
+                pass
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "entries": len(self._entries),
+                "backend": "redis" if self._redis is not None else "memory",
+            }
+
+
+# Process-wide cache shared by all ask() callers.
+response_cache = LLMCache()
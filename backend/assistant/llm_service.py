@@ -1,13 +1,38 @@
+import asyncio
 import os
+import random
+import time
+import weakref
 from typing import Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+from .llm_cache import make_key, response_cache
 
 # Shared wrapper for talking to the DeepSeek LLM via its OpenAI‑compatible API.
 # All conversational/report features call through this helper so swapping
 # providers only requires changes in this file.
 
 _client: Optional[OpenAI] = None
+# Async clients are cached per event loop, mirroring get_async_http_client:
+# a single module-global AsyncOpenAI would keep pool locks bound to whichever
+# loop created it and fail once that loop is gone (Flask async views run each
+# request on a fresh loop).
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Resolved once at import; ask() runs on every request and should not pay an
+# environ lookup per call.  Falls back to re-reading the env if the module
+# was imported before configuration was loaded.
+_MODEL_NAME: Optional[str] = os.getenv("DEEPSEEK_MODEL") or "deepseek-chat"
+
+
+def _model_name() -> str:
+    global _MODEL_NAME
+    if _MODEL_NAME is None:
+        _MODEL_NAME = os.getenv("DEEPSEEK_MODEL") or "deepseek-chat"
+    return _MODEL_NAME
 
 
 def _get_client() -> Optional[OpenAI]:
@@ -25,36 +50,251 @@ def _get_client() -> Optional[OpenAI]:
     if not api_key:
         return None
 
+    from utils.http_client import get_http_client
+
     base_url = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
     timeout_s = int(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
-    _client = OpenAI(api_key=api_key, base_url=base_url, timeout=timeout_s)
+    _client = OpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        timeout=timeout_s,
+        http_client=get_http_client(),
+    )
     return _client
 
 
-def ask(prompt: str, *, temperature: float = 0.1, max_tokens: int = 512) -> str:
-    """Send a user-facing prompt to the LLM and return the model's reply.
+def _get_async_client() -> Optional[AsyncOpenAI]:
+    """Async twin of _get_client(), one instance per running event loop.
+
+    Long-lived loops (the batch client's dispatcher) reuse their warm client
+    and keep-alive pool; short-lived per-request loops get a fresh one that
+    dies with the loop.  Must be called from within a coroutine.
+    """
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is not None:
+        return client
+
+    api_key = os.getenv("DEEPSEEK_API_KEY")
+    if not api_key:
+        return None
+
+    from utils.http_client import get_async_http_client
+
+    base_url = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
+    timeout_s = int(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+    client = AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        timeout=timeout_s,
+        http_client=get_async_http_client(),
+    )
+    _async_clients[loop] = client
+    return client
+
+
+# Transient provider blips (rate limits, gateway errors) should not surface
+# as user-visible 500s; retry a few times with capped exponential backoff and
+# full jitter before giving up.
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+_MAX_RETRIES = 3
+_BACKOFF_BASE_S = 0.25
+_BACKOFF_CAP_S = 8.0
+
+
+def _is_retryable(e: Exception) -> bool:
+    return getattr(e, "status_code", None) in _RETRYABLE_STATUS
+
+
+def _retry_delay(e: Exception, attempt: int) -> float:
+    """Honour Retry-After when the provider sends one, else full jitter."""
+    resp = getattr(e, "response", None)
+    if resp is not None:
+        try:
+            retry_after = float(resp.headers.get("Retry-After"))
+            if retry_after > 0:
+                return min(retry_after, _BACKOFF_CAP_S)
+        except (TypeError, ValueError, AttributeError):
+            pass
+    return random.uniform(0, min(_BACKOFF_CAP_S, _BACKOFF_BASE_S * (2 ** attempt)))
+
+
+def _build_messages(prompt: str, system: Optional[str]) -> list:
+    """Put the (byte-identical, static) system text first so providers can
+    reuse their cached prompt prefix across calls."""
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+async def ask_async(
+    prompt: str,
+    *,
+    system: Optional[str] = None,
+    temperature: float = 0.1,
+    max_tokens: int = 512,
+) -> str:
+    """Async version of ask() so independent prompts can overlap their
+    network round-trips via asyncio.gather (latency = max, not sum).
+
+    Shares the response cache with ask(); identical prompts hit either way.
+    """
 
-    This is deliberately minimal; callers are expected to build the system
-    / user prompt structure around it.
+    client = _get_async_client()
+    if client is None:
+        raise RuntimeError("DEEPSEEK_API_KEY is not set in the backend environment")
+
+    model_name = _model_name()
+
+    cache_key = None
+    if temperature <= 0.3:
+        cache_key = make_key(model_name, prompt, temperature, max_tokens, system)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    for attempt in range(_MAX_RETRIES + 1):
+        try:
+            resp = await client.chat.completions.create(
+                model=model_name,
+                messages=_build_messages(prompt, system),
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+            text = (resp.choices[0].message.content or "").strip()
+            if cache_key is not None:
+                response_cache.set(cache_key, text, ttl=3600)
+            return text
+        except Exception as e:
+            if attempt < _MAX_RETRIES and _is_retryable(e):
+                await asyncio.sleep(_retry_delay(e, attempt))
+                continue
+            msg = getattr(e, "message", None) or str(e)
+            raise RuntimeError(f"DeepSeek API error: {msg}") from e
+
+
+def ask_stream(
+    prompt: str,
+    *,
+    system: Optional[str] = None,
+    temperature: float = 0.1,
+    max_tokens: int = 512,
+):
+    """Yield the model's reply incrementally (one content delta per chunk).
+
+    Callers can forward the pieces over SSE so users see tokens at
+    time-to-first-token instead of waiting for the full completion.  The
+    joined text is stored in the response cache once the stream finishes;
+    a cache hit is yielded as a single chunk.
     """
 
     client = _get_client()
     if client is None:
         raise RuntimeError("DEEPSEEK_API_KEY is not set in the backend environment")
 
-    # Default to DeepSeek chat model; override via env when needed.
-    model_name = os.getenv("DEEPSEEK_MODEL") or "deepseek-chat"
+    model_name = _model_name()
+
+    cache_key = None
+    if temperature <= 0.3:
+        cache_key = make_key(model_name, prompt, temperature, max_tokens, system)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+    # Only the initial create call is retried; once content has streamed we
+    # cannot restart without duplicating output.
+    for attempt in range(_MAX_RETRIES + 1):
+        try:
+            resp = client.chat.completions.create(
+                model=model_name,
+                messages=_build_messages(prompt, system),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+            )
+            break
+        except Exception as e:
+            if attempt < _MAX_RETRIES and _is_retryable(e):
+                time.sleep(_retry_delay(e, attempt))
+                continue
+            msg = getattr(e, "message", None) or str(e)
+            raise RuntimeError(f"DeepSeek API error: {msg}") from e
 
     try:
-        resp = client.chat.completions.create(
-            model=model_name,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
-        return (resp.choices[0].message.content or "").strip()
+        parts = []
+        for chunk in resp:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                yield delta
+        if cache_key is not None and parts:
+            response_cache.set(cache_key, "".join(parts).strip(), ttl=3600)
     except Exception as e:
-        # Preserve a simple, user-friendly error surface while logging details server-side.
-        # (Flask will log the original exception; we only expose a short message.)
         msg = getattr(e, "message", None) or str(e)
         raise RuntimeError(f"DeepSeek API error: {msg}") from e
+
+
+def ask(
+    prompt: str,
+    *,
+    system: Optional[str] = None,
+    temperature: float = 0.1,
+    max_tokens: int = 512,
+) -> str:
+    """Send a user-facing prompt to the LLM and return the model's reply.
+
+    Pass the static, per-feature preamble via ``system`` (byte-identical
+    across calls) so the provider's prompt-prefix cache can skip its prefill.
+
+    With LLM_BATCH_CLIENT=1 the call is routed through the micro-batching
+    dispatcher so concurrent requests share one event loop and connection
+    pool instead of each worker thread blocking on its own round-trip.
+    """
+
+    from .batch_client import batch_client, batching_enabled
+
+    if batching_enabled():
+        return batch_client.submit(
+            prompt, system=system, temperature=temperature, max_tokens=max_tokens
+        )
+
+    client = _get_client()
+    if client is None:
+        raise RuntimeError("DEEPSEEK_API_KEY is not set in the backend environment")
+
+    # Default to DeepSeek chat model; override via env when needed.
+    model_name = _model_name()
+
+    # Low-temperature completions are deterministic enough to cache; skip
+    # the cache for anything more creative.
+    cache_key = None
+    if temperature <= 0.3:
+        cache_key = make_key(model_name, prompt, temperature, max_tokens, system)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    for attempt in range(_MAX_RETRIES + 1):
+        try:
+            resp = client.chat.completions.create(
+                model=model_name,
+                messages=_build_messages(prompt, system),
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+            text = (resp.choices[0].message.content or "").strip()
+            if cache_key is not None:
+                response_cache.set(cache_key, text, ttl=3600)
+            return text
+        except Exception as e:
+            if attempt < _MAX_RETRIES and _is_retryable(e):
+                time.sleep(_retry_delay(e, attempt))
+                continue
+            # Preserve a simple, user-friendly error surface while logging details server-side.
+            # (Flask will log the original exception; we only expose a short message.)
+            msg = getattr(e, "message", None) or str(e)
+            raise RuntimeError(f"DeepSeek API error: {msg}") from e
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
 from typing import List
 
-from flask import Blueprint, request, jsonify
+import pandas as pd
+from flask import Blueprint, g, has_app_context, request, jsonify, Response, stream_with_context
+from sqlalchemy import event, func, select, tuple_
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
-from models.transaction_model import TransactionRecord
+from models.transaction_model import TransactionRecord, TransactionMonthlyAgg
 from models.user_model import User
 from statements.analysis import (
     compute_time_aggregates,
@@ -19,7 +27,30 @@ from models.assistant_models import LoanDocument, BudgetSuggestion, AnomalyRecor
 from models import db
 from .schemas import LoanParsed, BudgetSuggestionModel, AnomalyExplanation
 
-from .llm_service import ask
+from utils.date_utils import prefix_date_range
+
+from .llm_cache import response_cache
+from .llm_service import ask, ask_async, ask_stream
+from .semantic_cache import query_cache, transactions_hash
+
+
+# orjson is 2-5x faster than stdlib json and matters here: aggregate payloads
+# serialized into prompts can reach megabytes for long histories.  Fall back
+# to stdlib when the wheel is unavailable.
+try:
+    import orjson
+
+    def _dumps(obj, sort_keys: bool = False) -> str:
+        opts = orjson.OPT_SORT_KEYS if sort_keys else 0
+        return orjson.dumps(obj, option=opts).decode()
+
+    def _loads(text):
+        return orjson.loads(text)
+except ImportError:  # pragma: no cover - orjson is in requirements
+    def _dumps(obj, sort_keys: bool = False) -> str:
+        return json.dumps(obj, sort_keys=sort_keys)
+
+    _loads = json.loads
 
 
 def _pydantic_json(obj) -> str:
@@ -28,7 +59,7 @@ def _pydantic_json(obj) -> str:
     if fn:
         return fn()
     d = _pydantic_dict(obj)
-    return json.dumps(d)
+    return _dumps(d)
 
 
 def _pydantic_dict(obj) -> dict:
@@ -41,29 +72,279 @@ def _pydantic_dict(obj) -> dict:
     return {}
 
 
+# Compiled once: strips any lead-in text before the first numeric block of a
+# forwarded bank SMS.  Handlers run this per message, so no per-request
+# compile-cache lookup (or local `import re`) on the hot path.
+_SMS_CLEAN = re.compile(r"^.*?(\d{2,})")
+
 assistant_bp = Blueprint("assistant", __name__, url_prefix="/assistant")
 
+# Static per-feature preambles, sent as the system message.  They must stay
+# byte-identical across calls (no per-user/per-date interpolation) so the
+# provider's prompt-prefix cache can skip re-prefilling them.
+SYS_ASSISTANT = (
+    "You are a helpful personal finance assistant. "
+    "Use the transaction history below to answer the user's question. "
+    "All amounts are in Indian Rupees (INR). Always use ₹ or 'INR' when mentioning amounts — never use $ or USD. "
+    "Be concise and do not hallucinate amounts."
+)
+SYS_ANALYST = (
+    "You are a financial analyst. "
+    "Write a concise monthly report based on the following aggregated data. "
+    "All amounts are in Indian Rupees (INR). Use ₹ or 'INR' for every amount — never use $ or USD. "
+    "Mention total spend, income, main categories, and suggest one or two improvements. "
+    "Return plain text."
+)
+SYS_BUDGET = (
+    "You are a budgeting assistant for users in India. "
+    "All amounts are in Indian Rupees (INR); use ₹ not $."
+)
+SYS_TAX = (
+    "You are a personal finance advisor familiar with Indian tax deductions (Section 80C, 80D, HRA, etc.). "
+    "All amounts in the data are in Indian Rupees (INR). In your response always use ₹ or 'INR' for amounts — never use $ or USD. "
+    "Given the user's aggregated spending summary below (per-category totals and largest transactions), suggest categories of spending where the user may be able to claim deductions or save tax. "
+    "Return a bullet-list in plain text."
+)
+SYS_ADVISOR = (
+    "You are a personal finance advisor for users in India. "
+    "All amounts are in Indian Rupees (INR). Use ₹ or INR only — never $ or USD."
+)
+
+# Per-feature generation budgets.  Providers allocate compute proportional to
+# max_tokens, so sizing each cap to the feature's observed output length
+# (instead of a blanket 1024) trims generation time and worst-case latency.
+MAX_TOKENS_QUERY = 512
+MAX_TOKENS_QUERY_LONG = 1024  # for long, multi-part questions
+MAX_TOKENS_REPORT = 768
+MAX_TOKENS_BUDGET = 768
+MAX_TOKENS_ANOMALY = 256
+MAX_TOKENS_LOAN = 1024
+MAX_TOKENS_TAX = 512
+MAX_TOKENS_INCOME = 384
+
+
+
+# Static prompt bodies, assembled once at import.  Handlers only splice the
+# per-request data in (already orjson-encoded), so the hot path does a single
+# f-string concatenation instead of rebuilding multi-sentence literals.
+PROMPT_ANOMALY_PREFIX = (
+    "You are an anomaly detector assistant. A user has an unusual transaction with these fields (amount is in Indian Rupees, INR): "
+)
+PROMPT_ANOMALY_SUFFIX = (
+    "When mentioning the amount, use ₹ or INR — never use $ or USD. "
+    "Write a short, non-technical explanation of what might have happened and any steps the user could take (e.g. verify with bank)."
+)
+PROMPT_LOAN_PREFIX = (
+    "You are a loan document analyst. Extract principal amount, interest rate, tenure, EMI, sanction date, lender name and any prepayment or foreclosure clauses from the following letter. "
+    "Assume all monetary amounts are in Indian Rupees (INR). Return strictly valid JSON with those keys (use null when a field is missing). Do not include any explanatory text.\n\n"
+)
+
+
+def _query_prompt(context: str, question: str) -> str:
+    return f"TRANSACTIONS:\n{context}\n\nQUESTION: {question}\nANSWER:"
+
+
+def _query_max_tokens(question: str) -> int:
+    """Long questions tend to invite longer answers; everything else fits in
+    the smaller budget."""
+    return MAX_TOKENS_QUERY_LONG if len(question) > 200 else MAX_TOKENS_QUERY
+
+
+def _load_txn_frame(user_id: int, since: str | None = None) -> pd.DataFrame:
+    """Load the analytics columns of a user's transactions into a DataFrame.
+
+    Fetching only (date, amount, category, subcategory) through pandas skips
+    ORM hydration entirely, and downstream aggregation becomes vectorized
+    column math instead of a per-row Python loop.
+    """
+
+    q = db.session.query(
+        TransactionRecord.date,
+        TransactionRecord.amount,
+        TransactionRecord.category,
+        TransactionRecord.subcategory,
+    ).filter(TransactionRecord.user_id == user_id)
+    if since:
+        start, end = prefix_date_range(since)
+        q = q.filter(TransactionRecord.date >= start, TransactionRecord.date < end)
+    q = q.order_by(TransactionRecord.date)
+
+    df = pd.read_sql(q.statement, db.session.get_bind())
+    # Numeric columns come back as Decimal on some drivers.
+    df["amount"] = df["amount"].astype(float)
+    return df
+
+
+def _analytics_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop analytics-excluded rows (P2P, uncategorized, blocked pairs) from a frame."""
+    cat = df["category"].fillna("").str.strip()
+    sub = df["subcategory"].fillna("").str.strip()
+    mask = ~cat.isin(EXCLUDED_ANALYTICS_CATEGORIES)
+    for c, s in EXCLUDED_ANALYTICS_CATEGORY_SUBCATEGORY:
+        mask &= ~((cat == c) & (sub == s))
+    return df[mask]
+
+
+# Frames are memoized twice: on flask.g for the lifetime of one request (the
+# /dashboard fan-out builds four prompts from the same data) and in a small
+# process-wide TTL cache so back-to-back requests in the same session reuse
+# one DB fetch.  60s of staleness is acceptable for advisory text.
+_frame_cache: "OrderedDict[tuple, tuple[float, pd.DataFrame]]" = OrderedDict()
+_frame_cache_lock = threading.Lock()
+_FRAME_CACHE_MAX = 1024
+_FRAME_TTL_S = 60.0
+
+
+def get_user_frame(
+    user_id: int, since: str | None = None, version: tuple | None = None
+) -> pd.DataFrame:
+    """Per-user transaction frame, shared across the report/budget/income/tax
+    code paths instead of each re-querying and re-building it.
+
+    Callers that already know the window's data version (row count, max id)
+    can pass it so their cache entry is never satisfied by a stale frame.
+    """
+    key = (user_id, since, version)
+
+    frames = g.setdefault("_txn_frames", {}) if has_app_context() else {}
+    if key in frames:
+        return frames[key]
+
+    now = time.monotonic()
+    df = None
+    with _frame_cache_lock:
+        hit = _frame_cache.get(key)
+        if hit is not None and now - hit[0] < _FRAME_TTL_S:
+            _frame_cache.move_to_end(key)
+            df = hit[1]
+
+    if df is None:
+        df = _load_txn_frame(user_id, since=since)
+        with _frame_cache_lock:
+            _frame_cache[key] = (now, df)
+            _frame_cache.move_to_end(key)
+            while len(_frame_cache) > _FRAME_CACHE_MAX:
+                _frame_cache.popitem(last=False)
+
+    frames[key] = df
+    return df
+
+
+_agg_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+_agg_cache_lock = threading.Lock()
+_AGG_CACHE_MAX = 2048
 
-def _excluded_from_analytics(t: TransactionRecord) -> bool:
-    """True if this transaction should be excluded from analytics (reports, budget, etc.)."""
-    cat = (t.category or "").strip()
-    sub = (t.subcategory or "").strip()
-    if cat in EXCLUDED_ANALYTICS_CATEGORIES:
-        return True
-    if (cat, sub) in EXCLUDED_ANALYTICS_CATEGORY_SUBCATEGORY:
-        return True
-    return False
 
+def _aggregates_for(user_id: int, since: str | None = None) -> dict:
+    """compute_time_aggregates over a user's window, memoized per data version.
 
-def _transactions_for_user(user_id: int, since: str | None = None) -> List[TransactionRecord]:
+    The cache key includes the window's row count and max id, so any insert
+    or delete naturally produces a new key; in-place edits are handled by the
+    after_update listener below.
+    """
+    q = db.session.query(
+        func.count(TransactionRecord.id), func.max(TransactionRecord.id)
+    ).filter(TransactionRecord.user_id == user_id)
+    if since:
+        start, end = prefix_date_range(since)
+        q = q.filter(TransactionRecord.date >= start, TransactionRecord.date < end)
+    txn_count, max_txn_id = q.one()
+
+    key = (user_id, since, txn_count, max_txn_id)
+    with _agg_cache_lock:
+        cached = _agg_cache.get(key)
+        if cached is not None:
+            _agg_cache.move_to_end(key)
+            return cached
+
+    df = _analytics_frame(
+        get_user_frame(user_id, since=since, version=(txn_count, max_txn_id))
+    )
+    # DataFrame overload: aggregation stays in vectorized groupbys instead
+    # of materializing a dict per row first.
+    aggregates = compute_time_aggregates(df)
+
+    with _agg_cache_lock:
+        _agg_cache[key] = aggregates
+        _agg_cache.move_to_end(key)
+        while len(_agg_cache) > _AGG_CACHE_MAX:
+            _agg_cache.popitem(last=False)
+    return aggregates
+
+
+@event.listens_for(TransactionRecord, "after_update")
+def _invalidate_agg_cache(mapper, connection, target):
+    """Drop cached aggregates when a row is edited in place (count/max id
+    unchanged, so the version key alone would not notice)."""
+    with _agg_cache_lock:
+        stale = [k for k in _agg_cache if k[0] == target.user_id]
+        for k in stale:
+            del _agg_cache[k]
+    with _frame_cache_lock:
+        stale = [k for k in _frame_cache if k[0] == target.user_id]
+        for k in stale:
+            del _frame_cache[k]
+    with _ctx_cache_lock:
+        stale = [k for k in _ctx_cache if k[0] == target.user_id]
+        for k in stale:
+            del _ctx_cache[k]
+
+
+def _transactions_for_user(
+    user_id: int,
+    since: str | None = None,
+    limit: int | None = None,
+    newest_first: bool = False,
+) -> List:
     """Helper to fetch a user's transactions, optionally filtering by
     date prefix (YYYY-MM or YYYY-MM-DD).
+
+    Rows excluded from analytics are filtered in SQL so they never cross the
+    driver or get hydrated into ORM objects just to be discarded.  Pass
+    ``limit`` with ``newest_first=True`` to fetch just the most recent rows
+    instead of reading the whole history and slicing in Python.
+
+    Returns lightweight ``Row`` tuples (id, date, description, amount,
+    category, subcategory), not ORM objects — callers only read those six
+    fields, and skipping full TransactionRecord hydration is 2-3x faster
+    with attribute access (``r.date``) unchanged.
     """
 
-    q = TransactionRecord.query.filter_by(user_id=user_id)
+    stmt = select(
+        TransactionRecord.id,
+        TransactionRecord.date,
+        TransactionRecord.description,
+        TransactionRecord.amount,
+        TransactionRecord.category,
+        TransactionRecord.subcategory,
+    ).where(TransactionRecord.user_id == user_id)
     if since:
-        q = q.filter(TransactionRecord.date.startswith(since))  # type: ignore[attr-defined]
-    return q.order_by(TransactionRecord.date).all()
+        # Range comparison instead of LIKE 'prefix%' so the (user_id, date)
+        # index is usable.
+        start, end = prefix_date_range(since)
+        stmt = stmt.where(TransactionRecord.date >= start, TransactionRecord.date < end)
+    stmt = stmt.where(~TransactionRecord.category.in_(list(EXCLUDED_ANALYTICS_CATEGORIES)))
+    stmt = stmt.where(
+        ~tuple_(TransactionRecord.category, TransactionRecord.subcategory).in_(
+            list(EXCLUDED_ANALYTICS_CATEGORY_SUBCATEGORY)
+        )
+    )
+    order = TransactionRecord.date.desc() if newest_first else TransactionRecord.date
+    stmt = stmt.order_by(order)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    else:
+        # Unbounded fetches stream from the driver in chunks instead of
+        # buffering the whole result set at once.
+        stmt = stmt.execution_options(yield_per=1000)
+    return db.session.execute(stmt).all()
+
+
+@assistant_bp.route("/llm-stats", methods=["GET"])
+@jwt_required()
+def llm_stats():
+    """Report LLM response-cache hit/miss counters (for tuning the cache)."""
+    return jsonify(response_cache.stats)
 
 
 @assistant_bp.route("/query", methods=["POST"])
@@ -76,6 +357,12 @@ def conversational_query():
     receive an answer in the response.  For performance we only send a few
     thousand characters of recent history to the LLM; if the application
     grows it would make sense to cache a summarised representation.
+
+    Deliberately a sync view: there is only one LLM round-trip here, and
+    Flask async views run on a fresh per-request event loop, so going
+    async would cost a new client and TLS handshake per request instead
+    of reusing the shared keep-alive pool (or the batching dispatcher).
+    /dashboard stays async because it overlaps four prompts.
     """
     try:
         return _conversational_query_impl()
@@ -83,6 +370,98 @@ def conversational_query():
         return jsonify({"error": str(e)}), 500
 
 
+def _category_summary(df: pd.DataFrame) -> dict:
+    """Per-category spend/count totals — a few dozen tokens instead of the
+    raw history."""
+    if df.empty:
+        return {}
+    spend = df["amount"].clip(lower=0)
+    grouped = df.assign(spend=spend).groupby("category").agg(
+        count=("amount", "size"), total_spend=("spend", "sum")
+    )
+    return {
+        cat: {"count": int(row["count"]), "total_spend": round(float(row["total_spend"]), 2)}
+        for cat, row in grouped.iterrows()
+    }
+
+
+_CONTEXT_BYTE_BUDGET = 10000
+
+
+def _format_context_lines(txns: List, budget: int = _CONTEXT_BYTE_BUDGET) -> str:
+    """Format transactions (oldest→newest) as prompt lines within a byte budget.
+
+    Single pass: each line is formatted once, a running counter enforces the
+    budget (dropping the oldest lines first), and the string is assembled
+    with one join — no post-hoc slicing or re-scanning of the full text.
+    """
+    kept: deque = deque()
+    total = 0
+    for t in reversed(txns):  # newest first so the budget favours recent rows
+        line = f"{t.date} \t {t.description} \t {t.amount} \t {t.category}/{t.subcategory}"
+        if total + len(line) + 1 > budget:
+            break
+        kept.appendleft(line)
+        total += len(line) + 1
+    return "\n".join(kept)
+
+
+# Rendered /query context blocks, keyed by data version: consecutive
+# questions from the same user reuse the string instead of re-querying and
+# re-formatting ~50 rows per hit.  Only a cheap indexed COUNT/MAX runs on
+# the hot path.
+_ctx_cache: "OrderedDict[tuple, tuple[str, str]]" = OrderedDict()
+_ctx_cache_lock = threading.Lock()
+_CTX_CACHE_MAX = 512
+
+
+def _query_context(user_id: int) -> tuple[str, str]:
+    """Build the /query context block plus its cache hash.
+
+    Token cost used to scale with the full history (500 raw rows).  The
+    context is now per-category totals over everything plus only the 50
+    most recent raw lines, so prompt size is O(categories + 50) regardless
+    of history length.  The rendered block is memoized per data version
+    (row count + max id, invalidated on in-place edits) so back-to-back
+    questions skip the fetch and formatting entirely.
+    """
+    txn_count, max_txn_id = (
+        db.session.query(func.count(TransactionRecord.id), func.max(TransactionRecord.id))
+        .filter(TransactionRecord.user_id == user_id)
+        .one()
+    )
+    key = (user_id, txn_count, max_txn_id)
+    with _ctx_cache_lock:
+        hit = _ctx_cache.get(key)
+        if hit is not None:
+            _ctx_cache.move_to_end(key)
+            return hit
+
+    summary = _category_summary(_analytics_frame(get_user_frame(user_id)))
+
+    # Raw detail only for the newest rows; reverse so it reads oldest→newest.
+    # (P2P/uncategorized rows are already filtered out in SQL.)
+    txns = list(reversed(_transactions_for_user(user_id, limit=50, newest_first=True)))
+    recent_raw = _format_context_lines(txns)
+
+    context = (
+        f"CATEGORY TOTALS (full history): {_dumps(summary)}\n\n"
+        f"RECENT TRANSACTIONS (newest last):\n{recent_raw}"
+    )
+    # Scope the semantic cache to both the recent rows and the aggregate
+    # totals so a change anywhere in the history invalidates it.
+    txn_hash = hashlib.blake2b(
+        (transactions_hash(txns) + _dumps(summary, sort_keys=True)).encode("utf-8")
+    ).hexdigest()[:16]
+
+    with _ctx_cache_lock:
+        _ctx_cache[key] = (context, txn_hash)
+        _ctx_cache.move_to_end(key)
+        while len(_ctx_cache) > _CTX_CACHE_MAX:
+            _ctx_cache.popitem(last=False)
+    return context, txn_hash
+
+
 def _conversational_query_impl():
     data = request.get_json() or {}
     question = data.get("question")
@@ -90,33 +469,144 @@ def _conversational_query_impl():
         return jsonify({"error": "question is required"}), 400
 
     user_id = int(get_jwt_identity())
-    txns = _transactions_for_user(user_id)
-
-    # build a lightweight context string; each line is one transaction (exclude P2P from analytics)
-    context_lines = []
-    for t in txns[-500:]:  # limit to last 500 rows
-        if _excluded_from_analytics(t):
-            continue
-        context_lines.append(
-            f"{t.date} \t {t.description} \t {t.amount} \t {t.category}/{t.subcategory}"
-        )
-    context = "\n".join(context_lines)
-    if len(context) > 10000:
-        context = context[-10000:]
-
-    prompt = (
-        "You are a helpful personal finance assistant. "
-        "Use the transaction history below to answer the user's question. "
-        "All amounts are in Indian Rupees (INR). Always use ₹ or 'INR' when mentioning amounts — never use $ or USD. "
-        "Be concise and do not hallucinate amounts.\n\n"
-        f"TRANSACTIONS:\n{context}\n\n"
-        f"QUESTION: {question}\nANSWER:"
-    )
+    context, txn_hash = _query_context(user_id)
+
+    # serve near-duplicate questions (rephrasings) from the semantic cache,
+    # scoped to this exact transaction set so stale answers are impossible
+    cached_answer = query_cache.get(user_id, txn_hash, question)
+    if cached_answer is not None:
+        return jsonify({"answer": cached_answer, "cached": True})
 
-    answer = ask(prompt, max_tokens=1024)
+    prompt = _query_prompt(context, question)
+
+    answer = ask(prompt, system=SYS_ASSISTANT, max_tokens=_query_max_tokens(question))
+    query_cache.set(user_id, txn_hash, question, answer)
     return jsonify({"answer": answer})
 
 
+def _sse_response(pieces) -> Response:
+    """Wrap an iterator of text pieces as a Server-Sent Events response."""
+
+    def event_stream():
+        try:
+            for piece in pieces:
+                yield f"data: {_dumps(piece)}\n\n"
+            yield "data: [DONE]\n\n"
+        except Exception as e:
+            yield f"data: {_dumps({'error': str(e)})}\n\n"
+
+    return Response(
+        stream_with_context(event_stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@assistant_bp.route("/query/stream", methods=["POST"])
+@jwt_required()
+def conversational_query_stream():
+    """Streaming variant of /query: tokens are forwarded over SSE as they
+    arrive, so perceived latency drops to time-to-first-token.
+    """
+    data = request.get_json() or {}
+    question = data.get("question")
+    if not question or not isinstance(question, str):
+        return jsonify({"error": "question is required"}), 400
+
+    user_id = int(get_jwt_identity())
+    context, txn_hash = _query_context(user_id)
+
+    cached_answer = query_cache.get(user_id, txn_hash, question)
+    if cached_answer is not None:
+        return _sse_response([cached_answer])
+
+    prompt = _query_prompt(context, question)
+
+    def generate():
+        parts = []
+        for piece in ask_stream(prompt, system=SYS_ASSISTANT, max_tokens=_query_max_tokens(question)):
+            parts.append(piece)
+            yield piece
+        query_cache.set(user_id, txn_hash, question, "".join(parts).strip())
+
+    return _sse_response(generate())
+
+
+# Month query param shared by /report, /report/stream, /income-advice and
+# /dashboard; prefix_date_range raises ValueError on anything else, so
+# reject malformed input with a 400 up front.
+_MONTH_PARAM_RE = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+
+def _report_month() -> "str | None":
+    """Return the validated month param (defaulting to the current month),
+    or None when the supplied value is not YYYY-MM."""
+    month = request.args.get("month")
+    if not month:
+        return datetime.utcnow().strftime("%Y-%m")
+    month = month.strip()
+    return month if _MONTH_PARAM_RE.match(month) else None
+
+
+@assistant_bp.route("/report/stream", methods=["GET"])
+@jwt_required()
+def monthly_report_stream():
+    """Streaming variant of /report (SSE). Accepts the same month parameter."""
+    month = _report_month()
+    if month is None:
+        return jsonify({"error": "month must be in YYYY-MM format"}), 400
+    user_id = int(get_jwt_identity())
+
+    prompt, _aggregates = _monthly_report_prompt(user_id, month)
+    return _sse_response(ask_stream(prompt, system=SYS_ANALYST, max_tokens=MAX_TOKENS_REPORT))
+
+
+def _month_summary_from_table(user_id: int, month: str) -> dict | None:
+    """Month aggregates served from the materialized rollup table.
+
+    One indexed SELECT over a handful of pre-summed rows replaces the
+    scan-and-group over raw transactions. Returns None when the table has
+    no rows for this user/month (e.g. data predating the rollup), in which
+    case the caller falls back to computing from raw transactions.
+    """
+    rows = TransactionMonthlyAgg.query.filter_by(user_id=user_id, month=month).all()
+    if not rows:
+        return None
+
+    categories = {}
+    total_spend = 0.0
+    total_income = 0.0
+    for r in rows:
+        spend = float(r.total_spend or 0)
+        total_spend += spend
+        total_income += float(r.total_income or 0)
+        key = f"{r.category or 'Unknown'} > {r.subcategory or 'Unknown'}"
+        categories[key] = {"total": round(spend, 2), "count": int(r.txn_count or 0)}
+
+    return {
+        "totals": {
+            "total_spend": round(total_spend, 2),
+            "total_income": round(total_income, 2),
+            "net": round(total_income - total_spend, 2),
+        },
+        # Month-grain table: no per-day breakdown; the report only uses
+        # by_month and totals.
+        "by_day": [],
+        "by_month": [{"period": month, "categories": categories}],
+        "by_year": [],
+    }
+
+
+def _monthly_report_prompt(user_id: int, month: str) -> tuple[str, dict]:
+    """Build the monthly-report prompt plus the aggregates it is based on."""
+    aggregates = _month_summary_from_table(user_id, month)
+    if aggregates is None:
+        aggregates = _aggregates_for(user_id, since=month)
+
+    prompt = f"DATA: {_dumps(aggregates)}\n"
+    return prompt, aggregates
+
+
 @assistant_bp.route("/report", methods=["GET"])
 @jwt_required()
 def monthly_report():
@@ -126,35 +616,14 @@ def monthly_report():
     - month: optional YYYY‑MM string (defaults to current month)
     """
 
-    month = request.args.get("month")
-    if not month:
-        month = datetime.utcnow().strftime("%Y-%m")
+    month = _report_month()
+    if month is None:
+        return jsonify({"error": "month must be in YYYY-MM format"}), 400
     user_id = int(get_jwt_identity())
 
-    txns = _transactions_for_user(user_id, since=month)
-    processed = [
-        {
-            "date": t.date,
-            "amount": float(t.amount),
-            "category": t.category,
-            "subcategory": t.subcategory,
-        }
-        for t in txns
-        if not _excluded_from_analytics(t)
-    ]
-    aggregates = compute_time_aggregates(processed)
-
-    # use triple-quoted string to avoid broken quotes
-    prompt = (
-        "You are a financial analyst. "
-        "Write a concise monthly report based on the following aggregated data. "
-        "All amounts are in Indian Rupees (INR). Use ₹ or 'INR' for every amount — never use $ or USD. "
-        "Mention total spend, income, main categories, and suggest one or two improvements. "
-        "Return plain text.\n\n"
-        f"DATA: {json.dumps(aggregates)}\n"
-    )
+    prompt, aggregates = _monthly_report_prompt(user_id, month)
     try:
-        report_text = ask(prompt, max_tokens=1024)
+        report_text = ask(prompt, system=SYS_ANALYST, max_tokens=MAX_TOKENS_REPORT)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -174,35 +643,39 @@ def smart_budget():
         return jsonify({"error": str(e)}), 500
 
 
-def _smart_budget_impl():
-    user_id = int(get_jwt_identity())
+def _smart_budget_prompt(user_id: int) -> tuple[str, str]:
+    """Build the budget prompt from income plus the last 3 months of spend.
+
+    Returns (prompt, idempotency_key).  The key hashes everything the prompt
+    depends on (user, month, 3-month spend, income), so two requests with
+    identical inputs produce the same key and the second can reuse the
+    first's stored suggestion instead of paying for a fresh completion.
+    """
     user = User.query.get(user_id)
     monthly_income = float(user.monthly_income or 0) if user else 0
 
     today = datetime.utcnow()
     since_date = (today - timedelta(days=90)).strftime("%Y-%m")
-    txns = _transactions_for_user(user_id, since=since_date)
-    processed = [
-        {"date": t.date, "amount": float(t.amount), "category": t.category, "subcategory": t.subcategory}
-        for t in txns
-        if not _excluded_from_analytics(t)
-    ]
-    aggregates = compute_time_aggregates(processed)
+    aggregates = _aggregates_for(user_id, since=since_date)
     by_month = aggregates.get("by_month") or []
     totals = aggregates.get("totals") or {}
     total_spend_3m = float(totals.get("total_spend") or 0)
     avg_monthly_spend = total_spend_3m / 3.0 if by_month else 0
 
+    month = today.strftime("%Y-%m")
+    idem = hashlib.blake2b(
+        f"{user_id}|{month}|{total_spend_3m:.2f}|{monthly_income}".encode()
+    ).hexdigest()
+
     if monthly_income <= 0:
         prompt = (
-            "You are a budgeting assistant for users in India. The user has not set their monthly income yet. "
-            f"Their spend history: by_month={json.dumps(by_month)}, total_spend_3m=₹{total_spend_3m:,.2f}. "
+            "The user has not set their monthly income yet. "
+            f"Their spend history: by_month={_dumps(by_month)}, total_spend_3m=₹{total_spend_3m:,.2f}. "
             "Propose a general monthly budget template. Return strict JSON only: "
             "{\"budgets\": {\"Food\": 15000, \"Transportation\": 5000, \"Savings\": 10000, ...}, \"explanation\": \"Short paragraph in INR (use ₹ not $). Suggest they set monthly income in profile for a personalised budget.\"}"
         )
     elif not by_month or total_spend_3m == 0:
         prompt = (
-            "You are a budgeting assistant for users in India. All amounts in INR; use ₹ not $. "
             f"The user's monthly income is ₹{monthly_income:,.2f}. They have no (or negligible) past spend data. "
             "Propose a sensible monthly budget that allocates their full income: use categories like Housing/Rent, Food & Groceries, "
             "Transportation, Utilities, Entertainment, Savings & Investments, Emergency fund, Miscellaneous. "
@@ -211,19 +684,18 @@ def _smart_budget_impl():
         )
     else:
         prompt = (
-            "You are a budgeting assistant for users in India. All amounts in INR; use ₹ not $. "
             f"The user's monthly income is ₹{monthly_income:,.2f}. "
             f"Their average monthly spend (last 3 months) is ₹{avg_monthly_spend:,.2f}. "
-            f"Per-month category breakdown: {json.dumps(by_month)}. "
+            f"Per-month category breakdown: {_dumps(by_month)}. "
             "Propose a realistic budget for the coming month: use their actual categories where possible, and suggest reining in or reallocating "
             "so total budget does not exceed income. Include Savings/Investments as a category. "
             "Return strict JSON only: {\"budgets\": {\"Category name\": amount_in_INR, ...}, \"explanation\": \"Short paragraph with ₹ amounts.\"}"
         )
-    try:
-        budget_answer = ask(prompt, max_tokens=1024)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return prompt, idem
+
 
+def _parse_budget_answer(budget_answer: str) -> "BudgetSuggestionModel":
+    """Normalize the model's budget reply into a BudgetSuggestionModel."""
     raw_text = (budget_answer or "").strip()
     if raw_text.startswith("```"):
         raw_text = raw_text.split("\n", 1)[-1] if "\n" in raw_text else raw_text[3:]
@@ -234,7 +706,7 @@ def _smart_budget_impl():
 
     parsed_budget_raw = None
     try:
-        parsed_budget_raw = json.loads(raw_text)
+        parsed_budget_raw = _loads(raw_text)
     except Exception:
         parsed_budget_raw = {"text": budget_answer}
 
@@ -250,13 +722,86 @@ def _smart_budget_impl():
     except Exception:
         # Fallback: store model text in explanation
         budget_model = BudgetSuggestionModel(budgets={}, explanation=str(budget_answer))
+    return budget_model
+
+
+# A regenerate click within this window with unchanged inputs reuses the
+# stored suggestion instead of a second LLM call.
+_BUDGET_IDEMPOTENCY_WINDOW = timedelta(minutes=15)
+
+
+def _smart_budget_impl():
+    user_id = int(get_jwt_identity())
+    prompt, idem = _smart_budget_prompt(user_id)
+
+    # Debounce: if we already answered this exact (income, spend window)
+    # recently, return the stored row — no LLM tokens spent.
+    existing = BudgetSuggestion.query.filter_by(
+        user_id=user_id, idempotency_key=idem
+    ).first()
+    if (
+        existing is not None
+        and existing.created_at is not None
+        and datetime.utcnow() - existing.created_at < _BUDGET_IDEMPOTENCY_WINDOW
+    ):
+        return jsonify({
+            "budget": _loads(existing.suggestion_json),
+            "id": existing.id,
+            "cached": True,
+        })
+
+    # ?defer=1 queues the prompt for the discounted Batch API instead of
+    # waiting on a synchronous completion; poll /assistant/batch/<id>.
+    if request.args.get("defer") == "1":
+        from .batch import enqueue_report
+
+        job = enqueue_report(user_id, prompt, kind="budget", system=SYS_BUDGET)
+        return jsonify({"job_id": job.id, "status": job.status}), 202
+
+    try:
+        budget_answer = ask(prompt, system=SYS_BUDGET, max_tokens=MAX_TOKENS_BUDGET)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    budget_model = _parse_budget_answer(budget_answer)
 
     month = datetime.utcnow().strftime("%Y-%m")
-    suggestion_json = _pydantic_json(budget_model)
-    bs = BudgetSuggestion(user_id=user_id, month=month, suggestion_json=suggestion_json)
-    db.session.add(bs)
+    # One model→dict conversion serves both the stored JSON and the
+    # response body; no second dump or parse of the same object.
+    budget_payload = _pydantic_dict(budget_model)
+    suggestion_json = _dumps(budget_payload)
+    if existing is not None:
+        # Stale row with the same key: refresh it in place so the unique
+        # (user_id, idempotency_key) constraint holds.
+        existing.month = month
+        existing.suggestion_json = suggestion_json
+        existing.created_at = datetime.utcnow()
+        bs = existing
+    else:
+        bs = BudgetSuggestion(
+            user_id=user_id, month=month,
+            suggestion_json=suggestion_json, idempotency_key=idem,
+        )
+        db.session.add(bs)
     db.session.commit()
-    return jsonify({"budget": _pydantic_dict(budget_model), "id": bs.id})
+    return jsonify({"budget": budget_payload, "id": bs.id})
+
+
+@assistant_bp.route("/batch/<int:job_id>", methods=["GET"])
+@jwt_required()
+def batch_job_status(job_id: int):
+    """Check the status/result of a deferred (batched) LLM job."""
+    from models.assistant_models import LLMBatchJob
+
+    job = LLMBatchJob.query.filter_by(id=job_id, user_id=int(get_jwt_identity())).first()
+    if not job:
+        return jsonify({"error": "job not found"}), 404
+    payload = {"job_id": job.id, "kind": job.kind, "status": job.status}
+    if job.status == "done":
+        payload["response"] = job.response
+    elif job.status == "failed":
+        payload["error"] = job.error
+    return jsonify(payload)
 
 
 @assistant_bp.route("/anomaly/explain", methods=["POST"])
@@ -267,11 +812,12 @@ def explain_anomaly():
     dictionary with date/amount/description.
     """
 
+    user_id = int(get_jwt_identity())
     data = request.get_json() or {}
     txn_id = data.get("transaction_id")
     details = data.get("details")
     if txn_id:
-        t = TransactionRecord.query.filter_by(id=txn_id, user_id=int(get_jwt_identity())).first()
+        t = TransactionRecord.query.filter_by(id=txn_id, user_id=user_id).first()
         if not t:
             return jsonify({"error": "transaction not found"}), 404
         details = {
@@ -283,21 +829,16 @@ def explain_anomaly():
     if not details or not isinstance(details, dict):
         return jsonify({"error": "transaction details required"}), 400
 
-    prompt = (
-        "You are an anomaly detector assistant. A user has an unusual transaction with these fields (amount is in Indian Rupees, INR): "
-        f"{json.dumps(details)}. "
-        "When mentioning the amount, use ₹ or INR — never use $ or USD. "
-        "Write a short, non-technical explanation of what might have happened and any steps the user could take (e.g. verify with bank)."
-    )
+    prompt = f"{PROMPT_ANOMALY_PREFIX}{_dumps(details)}. {PROMPT_ANOMALY_SUFFIX}"
     try:
-        explanation = ask(prompt, max_tokens=512)
+        explanation = ask(prompt, max_tokens=MAX_TOKENS_ANOMALY)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
     # try to parse/structure the explanation
     parsed_explanation = None
     try:
-        parsed_explanation = json.loads(explanation)
+        parsed_explanation = _loads(explanation)
     except Exception:
         # if the model returned plain text, wrap it
         parsed_explanation = {"text": explanation}
@@ -309,7 +850,7 @@ def explain_anomaly():
         ae = AnomalyExplanation(likely_cause=None, recommended_steps=None, raw=parsed_explanation)
 
     ar = AnomalyRecord(
-        user_id=int(get_jwt_identity()),
+        user_id=user_id,
         transaction_id=(txn_id if txn_id else None),
         description=(details.get("description") if isinstance(details, dict) else None),
         amount=(float(details.get("amount")) if isinstance(details, dict) and details.get("amount") is not None else None),
@@ -339,29 +880,25 @@ def analyze_loan_document():
     from statements.pdf_extract import extract_text
 
     user_id = int(get_jwt_identity())
-    import tempfile, os
-    tf = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-    tmp_path = tf.name
-    tf.close()
-    f.save(tmp_path)
-    text = extract_text(tmp_path, max_pages=20)
+    # Werkzeug already spools the upload into a seekable temp stream; hand
+    # that straight to the extractor (no second copy) and cap extraction at
+    # the prompt budget instead of reading all 20 pages.
+    src = f.stream
+    src.seek(0)
+    text = extract_text(src, max_pages=20, max_chars=16000)
     if not text:
         return jsonify({"error": "could not read PDF"}), 400
 
-    prompt = (
-        "You are a loan document analyst. Extract principal amount, interest rate, tenure, EMI, sanction date, lender name and any prepayment or foreclosure clauses from the following letter. "
-        "Assume all monetary amounts are in Indian Rupees (INR). Return strictly valid JSON with those keys (use null when a field is missing). Do not include any explanatory text.\n\n"
-        + text[:20000]
-    )
+    prompt = PROMPT_LOAN_PREFIX + text[:16000]
     try:
-        parsed = ask(prompt, max_tokens=1024)
+        parsed = ask(prompt, max_tokens=MAX_TOKENS_LOAN)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
     # Try to parse JSON from the model; fall back to raw text
     parsed_json_raw = None
     try:
-        parsed_json_raw = json.loads(parsed)
+        parsed_json_raw = _loads(parsed)
     except Exception:
         parsed_json_raw = {"text": parsed}
 
@@ -372,19 +909,40 @@ def analyze_loan_document():
     except Exception:
         loan_obj = LoanParsed(raw=parsed_json_raw)
 
-    # persist loan document (store validated or raw JSON)
+    # persist loan document (store validated or raw JSON); the same dict
+    # conversion feeds both the stored JSON and the response, so the model
+    # is serialized once and never re-parsed.
+    payload = _pydantic_dict(loan_obj)
     filename = os.path.basename(getattr(f, "filename", "loan.pdf"))
-    doc = LoanDocument(user_id=user_id, filename=filename, parsed_json=_pydantic_json(loan_obj))
+    doc = LoanDocument(user_id=user_id, filename=filename, parsed_json=_dumps(payload))
     db.session.add(doc)
     db.session.commit()
 
-    # cleanup temp file
-    try:
-        os.remove(tmp_path)
-    except Exception:
-        pass
-
-    return jsonify({"parsed": json.loads(doc.parsed_json), "id": doc.id})
+    return jsonify({"parsed": payload, "id": doc.id})
+
+
+def _tax_prompt(user_id: int) -> str:
+    """Build the tax-suggestions prompt over the user's transaction history."""
+    df = _analytics_frame(get_user_frame(user_id))
+    return _dumps(_build_tax_summary(df))
+
+
+def _build_tax_summary(df: pd.DataFrame) -> dict:
+    """Aggregate per-category totals plus the largest debits for the tax
+    prompt, instead of dumping every raw transaction into it."""
+    summary = {}
+    for cat, sub in df.groupby("category"):
+        spend = sub[sub["amount"] > 0]
+        top = [
+            {"date": r["date"], "amount": round(float(r["amount"]), 2)}
+            for r in spend.nlargest(5, "amount")[["date", "amount"]].to_dict("records")
+        ]
+        summary[cat] = {
+            "count": int(len(sub)),
+            "total_spend": round(float(spend["amount"].sum()), 2),
+            "largest": top,
+        }
+    return summary
 
 
 @assistant_bp.route("/tax/suggestions", methods=["GET"])
@@ -395,25 +953,24 @@ def tax_suggestions():
     """
 
     user_id = int(get_jwt_identity())
-    txns = _transactions_for_user(user_id)
-    data = [
-        {"date": t.date, "amount": float(t.amount), "category": t.category}
-        for t in txns
-        if not _excluded_from_analytics(t)
-    ]
-    prompt = (
-        "You are a personal finance advisor familiar with Indian tax deductions (Section 80C, 80D, HRA, etc.). "
-        "All amounts in the data are in Indian Rupees (INR). In your response always use ₹ or 'INR' for amounts — never use $ or USD. "
-        "Given the user's transaction history below, suggest categories of spending where the user may be able to claim deductions or save tax. Return a bullet-list in plain text.\n\n"
-        + json.dumps(data)
-    )
+    prompt = _tax_prompt(user_id)
     try:
-        advice = ask(prompt, max_tokens=1024)
+        advice = ask(prompt, system=SYS_TAX, max_tokens=MAX_TOKENS_TAX)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     return jsonify({"suggestions": advice})
 
 
+@assistant_bp.route("/tax/suggestions/stream", methods=["GET"])
+@jwt_required()
+def tax_suggestions_stream():
+    """Streaming variant of /tax/suggestions (SSE): plain-text advice is
+    forwarded token by token instead of buffering the full completion."""
+    user_id = int(get_jwt_identity())
+    prompt = _tax_prompt(user_id)
+    return _sse_response(ask_stream(prompt, system=SYS_TAX, max_tokens=MAX_TOKENS_TAX))
+
+
 @assistant_bp.route("/income-advice", methods=["GET"])
 @jwt_required()
 def income_advice():
@@ -427,43 +984,32 @@ def income_advice():
         return jsonify({"error": str(e)}), 500
 
 
-def _income_advice_impl():
-    month = request.args.get("month")
-    if not month:
-        month = datetime.utcnow().strftime("%Y-%m")
-    user_id = int(get_jwt_identity())
+def _income_advice_prompt(user_id: int, month: str) -> tuple[str | None, dict]:
+    """Build the income-advice prompt plus the numeric payload for the response.
+
+    Returns (None, payload) when there is nothing to ask the LLM (user missing
+    or monthly income not set); the payload is then the full response body.
+    """
     user = User.query.get(user_id)
     if not user:
-        return jsonify({"error": "User not found"}), 404
+        return None, {"error": "User not found"}
 
     monthly_income_val = float(user.monthly_income or 0)
     if monthly_income_val <= 0:
-        return jsonify({
+        return None, {
             "monthly_income": None,
             "monthly_spend": None,
             "surplus": None,
             "advice": None,
             "message": "Set your monthly income in your profile to get personalized investment or savings advice.",
-        }), 200
-
-    txns = _transactions_for_user(user_id, since=month)
-    processed = [
-        {"date": t.date, "amount": float(t.amount), "category": t.category, "subcategory": t.subcategory}
-        for t in txns
-        if not _excluded_from_analytics(t)
-    ]
-    monthly_spend = 0.0
-    for r in processed:
-        date_str = r.get("date") or ""
-        if date_str.startswith(month):
-            amt = float(r.get("amount") or 0)
-            if amt > 0:
-                monthly_spend += amt
-    monthly_spend = round(monthly_spend, 2)
+        }
+
+    # since=month already restricts the frame to that month's range in SQL
+    df = _analytics_frame(get_user_frame(user_id, since=month))
+    monthly_spend = round(float(df.loc[df["amount"] > 0, "amount"].sum()), 2)
     surplus = round(monthly_income_val - monthly_spend, 2)
     if surplus > 0:
         prompt = (
-            "You are a personal finance advisor for users in India. All amounts are in Indian Rupees (INR). Use ₹ or INR only — never $ or USD. "
             f"The user's monthly income is ₹{monthly_income_val:,.2f} and their total spending this month ({month}) is ₹{monthly_spend:,.2f}. "
             f"They have a surplus of ₹{surplus:,.2f}. "
             "Give concise, actionable investment advice: where they can invest this surplus (e.g. mutual funds, PPF, FDs, equity, debt), "
@@ -472,19 +1018,92 @@ def _income_advice_impl():
     else:
         deficit = abs(surplus)
         prompt = (
-            "You are a personal finance advisor for users in India. All amounts are in Indian Rupees (INR). Use ₹ or INR only — never $ or USD. "
             f"The user's monthly income is ₹{monthly_income_val:,.2f} and their total spending this month ({month}) is ₹{monthly_spend:,.2f}. "
             f"They are overspending by ₹{deficit:,.2f}. "
             "Give concise, actionable advice: how to limit spending, where to cut costs, and where they can save money (e.g. high-interest savings, reduce discretionary spend). "
             "Be encouraging but clear. Return plain text, 4–6 short bullet points or a short paragraph."
         )
-    advice_text = ask(prompt, max_tokens=1024)
-    return jsonify({
+    payload = {
         "monthly_income": monthly_income_val,
         "monthly_spend": round(monthly_spend, 2),
         "surplus": surplus,
         "month": month,
-        "advice": advice_text,
+    }
+    return prompt, payload
+
+
+def _income_advice_impl():
+    month = _report_month()
+    if month is None:
+        return jsonify({"error": "month must be in YYYY-MM format"}), 400
+    user_id = int(get_jwt_identity())
+
+    prompt, payload = _income_advice_prompt(user_id, month)
+    if prompt is None:
+        if "error" in payload:
+            return jsonify(payload), 404
+        return jsonify(payload), 200
+
+    payload["advice"] = ask(prompt, system=SYS_ADVISOR, max_tokens=MAX_TOKENS_INCOME)
+    return jsonify(payload)
+
+
+@assistant_bp.route("/dashboard", methods=["GET"])
+@jwt_required()
+async def dashboard():
+    """Fan out the report, budget, income-advice and tax prompts concurrently.
+
+    The four sections are independent, so a dashboard that previously issued
+    four serial requests paid ~4x the LLM round-trip; gathering them means
+    total latency is the slowest call, not the sum.  Read-only: unlike the
+    individual endpoints, nothing is persisted here.
+
+    Query parameters:
+    - month: optional YYYY-MM string (defaults to current month)
+    """
+    import asyncio
+
+    month = _report_month()
+    if month is None:
+        return jsonify({"error": "month must be in YYYY-MM format"}), 400
+    user_id = int(get_jwt_identity())
+
+    # All DB work happens up front; only the LLM calls run concurrently.
+    report_prompt, aggregates = _monthly_report_prompt(user_id, month)
+    budget_prompt, _budget_idem = _smart_budget_prompt(user_id)
+    income_prompt, income_payload = _income_advice_prompt(user_id, month)
+    tax_prompt = _tax_prompt(user_id)
+
+    async def _safe_ask(prompt, system):
+        if prompt is None:
+            return None
+        try:
+            return await ask_async(prompt, system=system, max_tokens=1024)
+        except Exception as e:
+            return {"error": str(e)}
+
+    report_text, budget_answer, income_advice_text, tax_advice = await asyncio.gather(
+        _safe_ask(report_prompt, SYS_ANALYST),
+        _safe_ask(budget_prompt, SYS_BUDGET),
+        _safe_ask(income_prompt, SYS_ADVISOR),
+        _safe_ask(tax_prompt, SYS_TAX),
+    )
+
+    if isinstance(budget_answer, str):
+        budget = _pydantic_dict(_parse_budget_answer(budget_answer))
+    else:
+        budget = budget_answer
+    if isinstance(income_advice_text, str):
+        income_payload["advice"] = income_advice_text
+    elif isinstance(income_advice_text, dict):
+        income_payload.update(income_advice_text)
+
+    return jsonify({
+        "month": month,
+        "report": {"report": report_text, "data": aggregates},
+        "budget": budget,
+        "income_advice": income_payload,
+        "tax_suggestions": tax_advice,
     })
 
 
@@ -507,8 +1126,7 @@ def parse_whatsapp_sms():
 
     sms = data.sms_text
     # simple clean‑up: remove anything before the first numeric block
-    import re
-    sms = re.sub(r"^.*?(\d{2,})", r"\1", sms)
+    sms = _SMS_CLEAN.sub(r"\1", sms)
 
     # fall back to existing categorization pipeline
     pipeline = get_pipeline()
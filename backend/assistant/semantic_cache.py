@@ -0,0 +1,90 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Embedding-similarity cache for the conversational /assistant/query route.
+# Users frequently rephrase the same question ("spend on food last month" vs
+# "how much did I spend on groceries in October"); one cheap local embedding
+# lets us answer those from cache instead of a ~1024-token chat completion.
+#
+# Entries are scoped per (user_id, transaction-set hash) so a cached answer is
+# never served after the underlying transactions change.  Requires the
+# optional `sentence-transformers` package; when it's missing the cache
+# degrades to a no-op and every query goes to the LLM as before.
+
+_MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+def transactions_hash(txns) -> str:
+    """Short digest of the transaction rows that feed the LLM context."""
+    joined = ",".join(f"{t.id}:{t.amount}" for t in txns)
+    return hashlib.blake2b(joined.encode("utf-8")).hexdigest()[:16]
+
+
+class SemanticCache:
+    """Per-user LRU of (question embedding, answer) pairs."""
+
+    def __init__(self, similarity_threshold: float = 0.92, max_entries_per_user: int = 128):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries_per_user = max_entries_per_user
+        self._lock = threading.Lock()
+        # (user_id, txn_hash) -> ordered list of (embedding, answer, ts)
+        self._entries: "OrderedDict[Tuple[int, str], List[Tuple[np.ndarray, str, float]]]" = OrderedDict()
+        self._model = None
+        self._model_failed = False
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        if self._model_failed:
+            return None
+        if self._model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+
+                self._model = SentenceTransformer(_MODEL_NAME)
+            except Exception:
+                self._model_failed = True
+                return None
+        vec = self._model.encode(text)
+        vec = np.asarray(vec, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        if norm == 0:
+            return None
+        return vec / norm
+
+    def get(self, user_id: int, txn_hash: str, question: str) -> Optional[str]:
+        emb = self._embed(question)
+        if emb is None:
+            return None
+        with self._lock:
+            entries = self._entries.get((user_id, txn_hash))
+            if not entries:
+                return None
+            matrix = np.stack([e[0] for e in entries])
+            sims = matrix @ emb  # embeddings are unit-normalised
+            best = int(np.argmax(sims))
+            if sims[best] > self.similarity_threshold:
+                self._entries.move_to_end((user_id, txn_hash))
+                return entries[best][1]
+            return None
+
+    def set(self, user_id: int, txn_hash: str, question: str, answer: str) -> None:
+        emb = self._embed(question)
+        if emb is None:
+            return
+        with self._lock:
+            entries = self._entries.setdefault((user_id, txn_hash), [])
+            entries.append((emb, answer, time.time()))
+            if len(entries) > self.max_entries_per_user:
+                del entries[0]
+            self._entries.move_to_end((user_id, txn_hash))
+            # keep the overall footprint bounded too
+            while len(self._entries) > 256:
+                self._entries.popitem(last=False)
+
+
+# Shared across requests; embeddings are cheap and the model loads lazily.
+query_cache = SemanticCache()
@@ -5,17 +5,52 @@ from flask_jwt_extended import create_access_token
 from models.user_model import User
 from models import db
 
+# Argon2 (argon2-cffi) replaces Werkzeug's default pbkdf2-sha256: the work
+# happens in a GIL-releasing C call instead of a tight Python hmac loop, so
+# other requests make progress during the ~30 ms of hashing.  Existing
+# pbkdf2 hashes keep verifying and are transparently upgraded on login.
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import VerificationError, InvalidHashError
+
+    _ph = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=2)
+except ImportError:  # pragma: no cover - argon2-cffi is in requirements
+    _ph = None
+
+
+def _hash_password(password: str) -> str:
+    if _ph is not None:
+        return _ph.hash(password)
+    return generate_password_hash(password)
+
+
+def _verify_password(stored: str, password: str) -> tuple[bool, bool]:
+    """Return (valid, needs_rehash); legacy Werkzeug hashes stay verifiable."""
+    if _ph is not None and stored.startswith("$argon2"):
+        try:
+            _ph.verify(stored, password)
+        except (VerificationError, InvalidHashError):
+            return False, False
+        return True, _ph.check_needs_rehash(stored)
+    ok = check_password_hash(stored, password)
+    # Valid but hashed with the old scheme: upgrade to Argon2 on this login.
+    return ok, ok and _ph is not None
+
 
 def register_user(data):
 
-    existing = User.query.filter_by(email=data.email).first()
-    if existing:
+    # Boolean EXISTS probe on the unique email index; no row is fetched or
+    # hydrated just to check for a clash.
+    taken = db.session.query(
+        User.query.filter_by(email=data.email).exists()
+    ).scalar()
+    if taken:
         return None, "User already exists"
 
     user = User(
         name=data.name,
         email=data.email,
-        password=generate_password_hash(data.password),
+        password=_hash_password(data.password),
         monthly_income=data.monthly_income,
     )
 
@@ -34,14 +69,27 @@ def register_user(data):
 
 def login_user(data):
 
-    user = User.query.filter_by(email=data.email).first()
+    # Only the four columns the login path touches; skips full ORM
+    # hydration (and any relationship loading) of the User row.
+    user = (
+        db.session.query(User.id, User.name, User.email, User.password)
+        .filter_by(email=data.email)
+        .first()
+    )
 
     if not user:
         return None, "Invalid email or password"
 
-    if not check_password_hash(user.password, data.password):
+    valid, needs_rehash = _verify_password(user.password, data.password)
+    if not valid:
         return None, "Invalid email or password"
 
+    if needs_rehash:
+        db.session.query(User).filter_by(id=user.id).update(
+            {"password": _hash_password(data.password)}
+        )
+        db.session.commit()
+
     token = create_access_token(identity=str(user.id))
 
     return {
@@ -49,4 +97,4 @@ def login_user(data):
         "name": user.name,
         "email": user.email,
         "token": token
-    }, None
\ No newline at end of file
+    }, None
@@ -1,19 +1,31 @@
 from __future__ import annotations
 
-import csv
+import hashlib
 import json
+import threading
+from collections import OrderedDict
 from io import StringIO
-from typing import List, Dict, Any
+from typing import List
 
+# Parsed CSVs keyed by content hash: re-uploads and retry flows POST the
+# exact same text, and for a big file re-parsing is hundreds of ms of pure
+# Python while re-hashing is a single C pass.
+_parse_cache: "OrderedDict[bytes, List[dict]]" = OrderedDict()
+_parse_cache_lock = threading.Lock()
+_PARSE_CACHE_MAX = 32
 
-def _get(row: Dict[str, Any], *keys: str):
-    for k in keys:
-        if k in row and row[k] not in (None, ""):
-            return row[k]
-    return None
 
+def _alias_column(df, *names):
+    """Row-wise first non-empty value across the alias columns, or None."""
+    series = None
+    for n in names:
+        if n in df.columns:
+            col = df[n].astype(str).where(df[n].astype(str) != "", None)
+            series = col if series is None else series.fillna(col)
+    return series
 
-def parse_transactions_csv(csv_text: str) -> List[dict]:
+
+def _parse_transactions_csv(csv_text: str) -> List[dict]:
     """
     Parses CSV into a list of RawTransaction-like dicts.
 
@@ -24,39 +36,97 @@ def parse_transactions_csv(csv_text: str) -> List[dict]:
     - amount
     - currency (optional)
     - line_items (optional JSON)
+
+    Parsing and column normalization run through pandas' C tokenizer and
+    vectorized string ops; the old csv.DictReader loop paid per-row dict
+    construction plus a Python float() per amount.
     """
-    f = StringIO(csv_text.strip())
-    reader = csv.DictReader(f)
-    out: List[dict] = []
-    for i, row in enumerate(reader):
-        transaction_id = _get(row, "transaction_id", "id") or f"ROW_{i+1}"
-        date = _get(row, "date", "txn_date", "transaction_date") or ""
-        description = (_get(row, "description", "narration", "remarks") or "").strip() or "Unknown"
-        amount_raw = _get(row, "amount", "debit", "value") or "0"
-        currency = _get(row, "currency") or "INR"
-
-        try:
-            amount = float(str(amount_raw).replace(",", "").strip())
-        except ValueError:
-            amount = 0.0
-
-        line_items = None
-        li_raw = _get(row, "line_items")
-        if li_raw:
-            try:
-                line_items = json.loads(li_raw)
-            except Exception:
-                line_items = None
-
-        out.append(
-            {
-                "transaction_id": str(transaction_id),
-                "date": str(date),
-                "description": str(description),
-                "amount": amount,
-                "currency": str(currency),
-                "line_items": line_items,
-            }
-        )
+    import pandas as pd
+
+    # read_csv raises EmptyDataError on zero-byte input where the old
+    # DictReader path simply yielded no rows; keep degenerate uploads a
+    # normal empty result.
+    csv_text = csv_text.strip()
+    if not csv_text:
+        return []
+
+    df = pd.read_csv(StringIO(csv_text), dtype=str, keep_default_na=False)
+    if df.empty:
+        return []
+    n = len(df)
+
+    tid = _alias_column(df, "transaction_id", "id")
+    if tid is None:
+        tid = pd.Series([None] * n, index=df.index)
+    tid = tid.fillna(pd.Series((f"ROW_{i + 1}" for i in range(n)), index=df.index))
+
+    date = _alias_column(df, "date", "txn_date", "transaction_date")
+    date = date.fillna("") if date is not None else pd.Series([""] * n, index=df.index)
+
+    desc = _alias_column(df, "description", "narration", "remarks")
+    desc = desc.fillna("") if desc is not None else pd.Series([""] * n, index=df.index)
+    desc = desc.str.strip()
+    desc = desc.where(desc != "", "Unknown")
+
+    amount_raw = _alias_column(df, "amount", "debit", "value")
+    if amount_raw is not None:
+        # to_numeric's C parser already skips surrounding whitespace, so the
+        # only pre-pass needed is dropping thousands separators — one string
+        # allocation per column instead of two.
+        amount = pd.to_numeric(
+            amount_raw.fillna("0").str.replace(",", "", regex=False),
+            errors="coerce",
+        ).fillna(0.0)
+    else:
+        amount = pd.Series([0.0] * n, index=df.index)
+
+    currency = _alias_column(df, "currency")
+    currency = currency.fillna("INR") if currency is not None else pd.Series(["INR"] * n, index=df.index)
+
+    out = pd.DataFrame({
+        "transaction_id": tid,
+        "date": date,
+        "description": desc,
+        "amount": amount,
+        "currency": currency,
+    }).to_dict("records")
+
+    # line_items is rare; parse JSON only for the rows that actually have it.
+    li = _alias_column(df, "line_items")
+    if li is None:
+        for row in out:
+            row["line_items"] = None
+    else:
+        for row, raw in zip(out, li):
+            if raw:
+                try:
+                    row["line_items"] = json.loads(raw)
+                except Exception:
+                    row["line_items"] = None
+            else:
+                row["line_items"] = None
     return out
 
+
+
+def parse_transactions_csv(csv_text: str) -> List[dict]:
+    """Content-hash cached wrapper around the CSV parser.
+
+    A duplicate upload costs one blake2b pass over the text instead of a
+    full re-parse.  Entries are copied out so callers can mutate rows
+    without poisoning the cache.
+    """
+    key = hashlib.blake2b(csv_text.encode("utf-8"), digest_size=16).digest()
+    with _parse_cache_lock:
+        hit = _parse_cache.get(key)
+        if hit is not None:
+            _parse_cache.move_to_end(key)
+            return [dict(r) for r in hit]
+
+    parsed = _parse_transactions_csv(csv_text)
+    with _parse_cache_lock:
+        _parse_cache[key] = parsed
+        _parse_cache.move_to_end(key)
+        while len(_parse_cache) > _PARSE_CACHE_MAX:
+            _parse_cache.popitem(last=False)
+    return [dict(r) for r in parsed]
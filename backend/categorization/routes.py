@@ -3,16 +3,18 @@ from __future__ import annotations
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from pydantic import ValidationError
+from sqlalchemy import insert
 
 from smart_categorization.core.pipeline import Transaction
 from llm_providers import categorize_batch_via_llm_chunked, get_chunked_provider, chunked_llm_available
 from models import db
-from models.transaction_model import TransactionRecord
+from models.transaction_model import TransactionRecord, TransactionMonthlyAgg
 
 from .csv_parser import parse_transactions_csv
 from .pipeline_service import get_pipeline
 from .schemas import (
     RawTransactionSchema,
+    RawTransactionListAdapter,
     CategorizeBatchSchema,
     CategorizeSmsSchema,
     CategorizeCorrectionSchema,
@@ -31,9 +33,9 @@ def _err(message, status=400):
 @jwt_required()
 def categorize_single():
     try:
-        data = RawTransactionSchema(**(request.get_json() or {}))
+        data = RawTransactionSchema.model_validate_json(request.get_data() or b"{}")
     except ValidationError as e:
-        return jsonify({"error": e.errors()}), 400
+        return jsonify({"error": e.errors(include_input=False)}), 400
 
     try:
         pipeline = get_pipeline()
@@ -55,11 +57,17 @@ def categorize_single():
             source="manual",
             bank=None,
         )
-        exists = TransactionRecord.query.filter_by(
-            user_id=user_id, hash_key=record.hash_key
-        ).first()
+        # Id-only probe on the unique (user_id, hash_key) index; no row is
+        # fetched or hydrated just to check for a duplicate.
+        exists = (
+            db.session.query(TransactionRecord.id)
+            .filter_by(user_id=user_id, hash_key=record.hash_key)
+            .limit(1)
+            .scalar()
+        )
         if not exists:
             db.session.add(record)
+            TransactionMonthlyAgg.refresh_months(user_id, [record.date[:7]])
             db.session.commit()
 
         return jsonify(payload), 200
@@ -74,14 +82,19 @@ def categorize_single():
 @jwt_required()
 def categorize_batch():
     try:
-        data = CategorizeBatchSchema(**(request.get_json() or {}))
+        data = CategorizeBatchSchema.model_validate_json(request.get_data() or b"{}")
     except ValidationError as e:
-        return jsonify({"error": e.errors()}), 400
+        return jsonify({"error": e.errors(include_input=False)}), 400
 
     txns = []
     if data.csv_text:
         parsed = parse_transactions_csv(data.csv_text)
-        txns = [RawTransactionSchema(**p) for p in parsed]
+        try:
+            # One adapter call validates every row in a single pass instead
+            # of constructing a model (and re-entering validation) per row.
+            txns = RawTransactionListAdapter.validate_python(parsed)
+        except ValidationError as e:
+            return jsonify({"error": e.errors(include_input=False)}), 400
     elif data.transactions:
         txns = data.transactions
     else:
@@ -89,7 +102,6 @@ def categorize_batch():
 
     try:
         pipeline = get_pipeline()
-        processed = []
 
         use_chunked = getattr(data, "use_llm_chunked", False)
         try:
@@ -99,70 +111,102 @@ def categorize_batch():
             has_llm = False
             provider = None
 
+        def _to_txn(t) -> Transaction:
+            return Transaction(
+                transaction_id=t.transaction_id or "txn",
+                date=t.date,
+                description=t.description,
+                amount=t.amount,
+                currency=t.currency,
+                line_items=[li.model_dump() for li in (t.line_items or [])] or None,
+            )
+
         if use_chunked and has_llm and len(txns) > 0:
             txn_dicts = [
-            {
-                "transaction_id": t.transaction_id or "txn",
-                "description": t.description,
-                "amount": t.amount,
-            }
-            for t in txns
-        ]
+                {
+                    "transaction_id": t.transaction_id or "txn",
+                    "description": t.description,
+                    "amount": t.amount,
+                }
+                for t in txns
+            ]
             chunked_results = categorize_batch_via_llm_chunked(txn_dicts)
             method = "gemini_chunked" if provider == "gemini" else "deepseek_chunked"
-            for t, res in zip(txns, chunked_results):
-                txn = Transaction(
-                    transaction_id=t.transaction_id or "txn",
-                    date=t.date,
-                    description=t.description,
-                    amount=t.amount,
-                    currency=t.currency,
-                    line_items=[li.model_dump() for li in (t.line_items or [])] or None,
-                )
-                processed.append(
-                    pipeline.process_with_category(
-                        txn,
+
+            def _iter_results():
+                for t, res in zip(txns, chunked_results):
+                    yield pipeline.process_with_category(
+                        _to_txn(t),
                         category=res["category"],
                         subcategory=res["subcategory"],
                         confidence=res["confidence"],
                         method=method,
                     )
-                )
         else:
-            for t in txns:
-                txn = Transaction(
-                    transaction_id=t.transaction_id or "txn",
-                    date=t.date,
-                    description=t.description,
-                    amount=t.amount,
-                    currency=t.currency,
-                    line_items=[li.model_dump() for li in (t.line_items or [])] or None,
-                )
-                processed.append(pipeline.process(txn, enable_llm_fallback=False))
 
-        processed_dicts = [p.to_dict() for p in processed]
+            def _iter_results():
+                yield from pipeline.process_many(
+                    [_to_txn(t) for t in txns], enable_llm_fallback=False
+                )
 
         user_id = int(get_jwt_identity())
-        for row in processed_dicts:
-            record = TransactionRecord.from_processed(
-                user_id=user_id,
-                processed=row,
-                source="csv" if data.csv_text else "batch",
-                bank=None,
+        source = "csv" if data.csv_text else "batch"
+
+        # Single fused pass: each row is processed, converted to a dict and
+        # turned into a TransactionRecord in one go.  The full result lists
+        # are only materialized when the response actually echoes them.
+        records = []
+        processed_dicts = [] if data.return_results else None
+        processed_objs = [] if data.include_summary else None
+        count = 0
+        for result in _iter_results():
+            row = result.to_dict()
+            count += 1
+            records.append(
+                TransactionRecord.values_from_processed(
+                    user_id,
+                    row,
+                    source=source,
+                    bank=None,
+                )
             )
-            exists = TransactionRecord.query.filter_by(
-                user_id=user_id, hash_key=record.hash_key
-            ).first()
-            if exists:
+            if processed_dicts is not None:
+                processed_dicts.append(row)
+            if processed_objs is not None:
+                processed_objs.append(result)
+        # One indexed IN-lookup for the whole batch instead of a SELECT per
+        # row (N+1); duplicates within the batch itself are dropped too.
+        hash_keys = [r["hash_key"] for r in records]
+        seen = set()
+        if hash_keys:
+            seen = {
+                hk
+                for (hk,) in db.session.query(TransactionRecord.hash_key).filter(
+                    TransactionRecord.user_id == user_id,
+                    TransactionRecord.hash_key.in_(hash_keys),
+                )
+            }
+        to_insert = []
+        for record in records:
+            if record["hash_key"] in seen:
                 continue
-            db.session.add(record)
+            seen.add(record["hash_key"])
+            to_insert.append(record)
+        if to_insert:
+            # Core multi-row INSERT (executemany): the rows are already
+            # plain column-value dicts, so no ORM objects, identity-map
+            # entries or per-row flush bookkeeping are involved at all.
+            db.session.execute(insert(TransactionRecord.__table__), to_insert)
+            TransactionMonthlyAgg.refresh_months(
+                user_id, {r["date"][:7] for r in to_insert}
+            )
         db.session.commit()
 
-        payload = {"count": len(processed)}
+        payload = {"count": count}
         if data.return_results:
             payload["results"] = processed_dicts
         if data.include_summary:
-            payload["summary"] = pipeline.get_summary(processed)
+            payload["summary"] = pipeline.get_summary(processed_objs)
 
         return jsonify(payload), 200
     except Exception as e:
@@ -176,9 +220,9 @@ def categorize_batch():
 @jwt_required()
 def categorize_sms():
     try:
-        data = CategorizeSmsSchema(**(request.get_json() or {}))
+        data = CategorizeSmsSchema.model_validate_json(request.get_data() or b"{}")
     except ValidationError as e:
-        return jsonify({"error": e.errors()}), 400
+        return jsonify({"error": e.errors(include_input=False)}), 400
 
     if data.bank == "hdfc":
         parsed = parse_hdfc_sms(data.sms_text)
@@ -203,11 +247,15 @@ def categorize_sms():
             source="sms",
             bank=data.bank,
         )
-        exists = TransactionRecord.query.filter_by(
-            user_id=user_id, hash_key=record.hash_key
-        ).first()
+        exists = (
+            db.session.query(TransactionRecord.id)
+            .filter_by(user_id=user_id, hash_key=record.hash_key)
+            .limit(1)
+            .scalar()
+        )
         if not exists:
             db.session.add(record)
+            TransactionMonthlyAgg.refresh_months(user_id, [record.date[:7]])
             db.session.commit()
 
         return jsonify({"parsed": parsed, "result": result_dict}), 200
@@ -225,9 +273,9 @@ def record_correction():
     Optional endpoint: lets the UI submit a correction so the feedback store learns.
     """
     try:
-        data = CategorizeCorrectionSchema(**(request.get_json() or {}))
+        data = CategorizeCorrectionSchema.model_validate_json(request.get_data() or b"{}")
     except ValidationError as e:
-        return jsonify({"error": e.errors()}), 400
+        return jsonify({"error": e.errors(include_input=False)}), 400
 
     pipeline = get_pipeline()
     pipeline.correct_transaction(
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import date
 from typing import List, Optional, Literal, Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class LineItemSchema(BaseModel):
@@ -20,6 +20,11 @@ class RawTransactionSchema(BaseModel):
     line_items: Optional[List[LineItemSchema]] = None
 
 
+# Validates a whole list of rows in one C-level pass; building the adapter
+# once at import amortizes pydantic's schema compilation across requests.
+RawTransactionListAdapter = TypeAdapter(List[RawTransactionSchema])
+
+
 class CategorizeBatchSchema(BaseModel):
     transactions: Optional[List[RawTransactionSchema]] = None
     csv_text: Optional[str] = None
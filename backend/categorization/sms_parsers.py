@@ -16,25 +16,34 @@ def _to_iso_date(s: str) -> str:
     return s  # best-effort
 
 
+# Compiled once at import: per-call re.search with string patterns pays a
+# cache lookup plus flag parsing on every SMS, which adds up when batches of
+# messages are classified.
+_AMOUNT_RE = re.compile(r"Rs\.?([\d,]+(?:\.\d+)?)", re.I)
+_HDFC_DESC_RE = re.compile(r"to (?:VPA )?([A-Z0-9@]+)", re.I)
+_HDFC_DATE_RE = re.compile(r"on (\d{2}-\w{3}-\d{2}|\d{2}/\d{2}/\d{2,4})", re.I)
+_SBI_DATE_RE = re.compile(r"on (\d{1,2}/\d{1,2}/\d{2,4})", re.I)
+_SBI_DESC_RE = re.compile(r"\bto\b\s+(.+?)(?:\.|Available|Avl|Bal|Ref|$)", re.I)
+# "@" becomes a space, bank suffixes are dropped — one scan over the VPA
+# instead of three chained str.replace passes.
+_VPA_NOISE_RE = re.compile(r"@|ICICI|AXISBANK")
+
+
+def _clean_vpa(vpa: str) -> str:
+    return _VPA_NOISE_RE.sub(lambda m: " " if m.group() == "@" else "", vpa).strip()
+
+
 def parse_hdfc_sms(sms: str) -> dict:
     """
     Example:
     "HDFC Bank: Rs.450.00 debited from A/c XX1234 on 15-Jan-24 to VPA ZOMATO@ICICI Ref No 456789"
     """
-    amount_match = re.search(r"Rs\.?([\d,]+(?:\.\d+)?)", sms, re.I)
-    desc_match = re.search(r"to (?:VPA )?([A-Z0-9@]+)", sms, re.I)
-    date_match = re.search(r"on (\d{2}-\w{3}-\d{2}|\d{2}/\d{2}/\d{2,4})", sms, re.I)
+    amount_match = _AMOUNT_RE.search(sms)
+    desc_match = _HDFC_DESC_RE.search(sms)
+    date_match = _HDFC_DATE_RE.search(sms)
 
     amount = float(amount_match.group(1).replace(",", "")) if amount_match else 0.0
-    description = (
-        desc_match.group(1)
-        .replace("@", " ")
-        .replace("ICICI", "")
-        .replace("AXISBANK", "")
-        .strip()
-        if desc_match
-        else sms[:60]
-    )
+    description = _clean_vpa(desc_match.group(1)) if desc_match else sms[:60]
     date = _to_iso_date(date_match.group(1)) if date_match else datetime.now().date().isoformat()
     return {"description": description, "amount": amount, "date": date}
 
@@ -44,10 +53,10 @@ def parse_sbi_sms(sms: str) -> dict:
     Example:
     "SBI: Your A/c XX5678 is debited by Rs.1,200.00 on 16/01/24 to BIGBASKET ORDER."
     """
-    amount_match = re.search(r"Rs\.?([\d,]+(?:\.\d+)?)", sms, re.I)
-    date_match = re.search(r"on (\d{1,2}/\d{1,2}/\d{2,4})", sms, re.I)
+    amount_match = _AMOUNT_RE.search(sms)
+    date_match = _SBI_DATE_RE.search(sms)
     # SBI sometimes uses "to <DESC>" or "trf to <DESC>"
-    desc_match = re.search(r"\bto\b\s+(.+?)(?:\.|Available|Avl|Bal|Ref|$)", sms, re.I)
+    desc_match = _SBI_DESC_RE.search(sms)
 
     amount = float(amount_match.group(1).replace(",", "")) if amount_match else 0.0
     description = desc_match.group(1).strip() if desc_match else sms[:60]
@@ -38,6 +38,18 @@ class Config:
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Connection pool tuned for batch ingest (MySQL only; the SQLite dev
+    # fallback needs none of this).  pool_pre_ping recycles connections the
+    # server closed at wait_timeout instead of failing the next request;
+    # pool_recycle stays under MySQL's default 8h timeout.
+    if SQLALCHEMY_DATABASE_URI.startswith("mysql"):
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            "pool_recycle": 1800,
+            "pool_pre_ping": True,
+        }
+
     # -------------------------
     # JWT
     # -------------------------
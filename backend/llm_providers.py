@@ -4,6 +4,7 @@ Supports chunked processing: split data, call LLM per chunk, merge results.
 """
 from __future__ import annotations
 
+import functools
 import os
 import re
 import json
@@ -49,9 +50,12 @@ def _get_deepseek_client():
     if not api_key:
         return None
     from openai import OpenAI
+    from utils.http_client import get_http_client
     base_url = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
     timeout_s = int(os.getenv("LLM_TIMEOUT_SECONDS", "180"))
-    _deepseek_client = OpenAI(api_key=api_key, base_url=base_url, timeout=timeout_s)
+    _deepseek_client = OpenAI(
+        api_key=api_key, base_url=base_url, timeout=timeout_s, http_client=get_http_client()
+    )
     return _deepseek_client
 
 
@@ -95,7 +99,43 @@ def complete_text(
 ) -> str:
     """
     Call the given provider (gemini | deepseek) and return raw text.
+
+    Low-temperature completions are cached in the shared LLM response
+    cache (keyed by provider+model and the full prompt), so re-running
+    batch categorization over overlapping chunks skips the repeat
+    round-trips.
     """
+    cache_key = None
+    if temperature <= 0.3:
+        from assistant.llm_cache import make_key, response_cache
+
+        if provider == "gemini":
+            model_label = "gemini:" + os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+        else:
+            model_label = "deepseek:" + os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
+        cache_key = make_key(model_label, prompt, temperature, max_tokens, system)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    text = _complete_text_uncached(
+        provider, prompt, system=system, max_tokens=max_tokens, temperature=temperature
+    )
+    if cache_key is not None and text:
+        from assistant.llm_cache import response_cache
+
+        response_cache.set(cache_key, text, ttl=3600)
+    return text
+
+
+def _complete_text_uncached(
+    provider: str,
+    prompt: str,
+    *,
+    system: Optional[str] = None,
+    max_tokens: int = 2048,
+    temperature: float = 0.1,
+) -> str:
     if provider == "gemini":
         model = _get_gemini_model()
         if model is None:
@@ -138,44 +178,34 @@ def complete_text(
         raise ValueError(f"Unknown provider: {provider}")
 
 
+# Strips markdown code fences (with or without a "json" label) so the
+# decoder below only sees payload text.
+_FENCE_RE = re.compile(r"```(?:json)?", re.I)
+# raw_decode parses exactly one JSON value starting at a given offset and
+# ignores trailing prose, so no regex over the whole response is needed.
+_JSON_DECODER = json.JSONDecoder()
+
+
 def _extract_json_array(text: str) -> Optional[list]:
     if not text or not text.strip():
         return None
     text = text.strip()
     if "```" in text:
-        parts = text.split("```")
-        for p in parts[1:]:
-            p = p.strip()
-            if p.lower().startswith("json"):
-                p = p[4:].strip()
-            if p.startswith("["):
-                try:
-                    return json.loads(p)
-                except json.JSONDecodeError:
-                    pass
-            if p.startswith("{"):
-                try:
-                    obj = json.loads(p)
-                    if isinstance(obj, dict) and "transactions" in obj:
-                        return obj["transactions"]
-                    if isinstance(obj, list):
-                        return obj
-                except json.JSONDecodeError:
-                    pass
-    match = re.search(r"\[[\s\S]*\]", text)
-    if match:
+        text = _FENCE_RE.sub("", text)
+
+    # Single scan: decode one JSON value at each bracket/brace candidate
+    # position (earliest first) instead of the old greedy [\s\S]* regex,
+    # which went quadratic on long outputs with stray brackets.
+    candidates = [i for i in (text.find("["), text.find("{")) if i != -1]
+    for start in sorted(candidates):
         try:
-            return json.loads(match.group(0))
-        except json.JSONDecodeError:
-            pass
-    try:
-        parsed = json.loads(text)
+            parsed, _ = _JSON_DECODER.raw_decode(text, start)
+        except (json.JSONDecodeError, ValueError):
+            continue
         if isinstance(parsed, list):
             return parsed
         if isinstance(parsed, dict) and "transactions" in parsed:
             return parsed["transactions"]
-    except json.JSONDecodeError:
-        pass
     return None
 
 
@@ -200,10 +230,31 @@ def complete_json_array(
 # ---------------------------------------------------------------------------
 
 BATCH_CATEGORIZE_CHUNK_SIZE = int(os.getenv("BATCH_CATEGORIZE_CHUNK_SIZE", "15"))
+# Chunks are independent, so they are flown concurrently; both providers
+# pipeline concurrent requests server-side (continuous batching), making the
+# wall time ~one chunk instead of len(chunks) round-trips.
+BATCH_CATEGORIZE_CONCURRENCY = int(os.getenv("BATCH_CATEGORIZE_CONCURRENCY", "8"))
+
+
+# The classifier preamble is identical for every chunk and every request;
+# building it once also keeps the bytes stable for provider-side prompt
+# caching.
+_BATCH_SYSTEM = (
+    "You are a transaction classifier for Indian personal finance. "
+    "You MUST choose Category and Subcategory from the allowed taxonomy only. "
+    "Return ONLY a valid JSON array with one object per transaction in the same order. "
+    "Each object must have: index (0-based), category, subcategory, confidence (0-1)."
+)
 
 
+@functools.lru_cache(maxsize=1)
 def _taxonomy_summary() -> str:
-    """Short taxonomy list for batch prompt."""
+    """Short taxonomy list for batch prompt.
+
+    The taxonomy is static for the process lifetime, so the dict walk and
+    join run once; call _taxonomy_summary.cache_clear() if a taxonomy
+    reload path is ever added.
+    """
     try:
         from smart_categorization.data.taxonomy import CATEGORY_TAXONOMY
         lines = []
@@ -233,15 +284,14 @@ def categorize_batch_via_llm_chunked(
     except Exception:
         provider = "deepseek"
     taxonomy = _taxonomy_summary()
-    system = (
-        "You are a transaction classifier for Indian personal finance. "
-        "You MUST choose Category and Subcategory from the allowed taxonomy only. "
-        "Return ONLY a valid JSON array with one object per transaction in the same order. "
-        "Each object must have: index (0-based), category, subcategory, confidence (0-1)."
-    )
-    results = []
-    for start in range(0, len(transactions), chunk_size):
-        chunk = transactions[start : start + chunk_size]
+    system = _BATCH_SYSTEM
+    chunks = [
+        transactions[start : start + chunk_size]
+        for start in range(0, len(transactions), chunk_size)
+    ]
+
+    def _categorize_chunk(args: tuple[int, list[dict]]) -> list[dict]:
+        start, chunk = args
         numbered = []
         for i, t in enumerate(chunk):
             tid = t.get("transaction_id") or t.get("id") or f"txn_{start + i}"
@@ -260,10 +310,11 @@ def categorize_batch_via_llm_chunked(
             provider, user, system=system, max_tokens=2048, temperature=0.1
         )
         arr = _extract_json_array(raw)
+        out = []
         if not isinstance(arr, list):
             for _ in chunk:
-                results.append({"category": "Shopping", "subcategory": "Electronics", "confidence": 0.3})
-            continue
+                out.append({"category": "Shopping", "subcategory": "Electronics", "confidence": 0.3})
+            return out
         by_idx = {int(item.get("index", i)): item for i, item in enumerate(arr) if isinstance(item, dict)}
         for i in range(len(chunk)):
             item = by_idx.get(i, {})
@@ -273,5 +324,18 @@ def categorize_batch_via_llm_chunked(
                 conf = float(item.get("confidence") or 0.5)
             except (TypeError, ValueError):
                 conf = 0.5
-            results.append({"category": cat, "subcategory": sub, "confidence": max(0, min(1, conf))})
-    return results
+            out.append({"category": cat, "subcategory": sub, "confidence": max(0, min(1, conf))})
+        return out
+
+    indexed = list(zip(range(0, len(transactions), chunk_size), chunks))
+    if len(chunks) == 1:
+        return _categorize_chunk(indexed[0])
+
+    # executor.map preserves input order, so the flattened results line up
+    # with the input list exactly as the serial loop did.
+    from concurrent.futures import ThreadPoolExecutor
+
+    workers = min(BATCH_CATEGORIZE_CONCURRENCY, len(chunks))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        per_chunk = list(ex.map(_categorize_chunk, indexed))
+    return [item for chunk_result in per_chunk for item in chunk_result]
@@ -1,3 +1,5 @@
+from sqlalchemy import inspect, text
+
 from models import db
 
 
@@ -13,12 +15,85 @@ class LoanDocument(db.Model):
 
 class BudgetSuggestion(db.Model):
     __tablename__ = "budget_suggestions"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "idempotency_key", name="uq_budget_user_idem"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), index=True, nullable=False)
     month = db.Column(db.String(7), nullable=False)  # YYYY-MM
     suggestion_json = db.Column(db.Text, nullable=True)
+    # Hash of (user, month, spend window, income) — identical inputs map to
+    # the same key so repeated "Regenerate" clicks can reuse the prior row.
+    idempotency_key = db.Column(db.String(128), nullable=True)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+
+def ensure_assistant_schema():
+    """In-place migrations for schema added after a deployment's tables
+    were first created.
+
+    The app's only schema mechanism is db.create_all(), which creates
+    missing tables but never alters existing ones — a database predating
+    idempotency_key would fail every budget query with 'no such column',
+    and one predating ix_txn_user_date would silently run the analytics
+    range scans without the index they were written for.  Runs once at
+    startup, right after create_all; a no-op when everything is present.
+    """
+    inspector = inspect(db.engine)
+    tables = set(inspector.get_table_names())
+
+    if "budget_suggestions" in tables:
+        columns = {c["name"] for c in inspector.get_columns("budget_suggestions")}
+        if "idempotency_key" not in columns:
+            db.session.execute(text(
+                "ALTER TABLE budget_suggestions ADD COLUMN idempotency_key VARCHAR(128)"
+            ))
+            db.session.commit()
+            # SQLite cannot add a table constraint in place; a unique index
+            # gives the same (user_id, idempotency_key) guarantee create_all
+            # declares for fresh tables.  Best effort — the debounce still
+            # works without it.
+            try:
+                db.session.execute(text(
+                    "CREATE UNIQUE INDEX uq_budget_user_idem "
+                    "ON budget_suggestions (user_id, idempotency_key)"
+                ))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+
+    if "transactions" in tables:
+        indexes = {i["name"] for i in inspector.get_indexes("transactions")}
+        if "ix_txn_user_date" not in indexes:
+            db.session.execute(text(
+                "CREATE INDEX ix_txn_user_date ON transactions (user_id, date)"
+            ))
+            db.session.commit()
+
+
+class LLMBatchJob(db.Model):
+    """Deferred LLM job submitted through the provider's Batch API.
+
+    Non-interactive prompts (scheduled reports, budgets, tax scans) are
+    queued here and flushed together; batched requests are billed at a
+    discount and tolerate minutes of latency.
+    """
+
+    __tablename__ = "llm_batch_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), index=True, nullable=False)
+    kind = db.Column(db.String(32), nullable=False)  # report | budget | tax
+    prompt = db.Column(db.Text, nullable=False)
+    system = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(16), nullable=False, default="pending", index=True)
+    # pending -> submitted -> done | failed
+    provider_batch_id = db.Column(db.String(64), nullable=True)
+    response = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
+    completed_at = db.Column(db.DateTime, nullable=True)
 
 
 class AnomalyRecord(db.Model):
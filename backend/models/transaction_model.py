@@ -1,8 +1,21 @@
 import hashlib
 import json
 
+from sqlalchemy import and_, case, func, not_
+
 from models import db
 
+# orjson serializes the per-row tags list several times faster than stdlib
+# json; bulk ingest calls this once per transaction.
+try:
+    import orjson
+
+    def _dumps_tags(tags) -> str:
+        return orjson.dumps(tags).decode()
+except ImportError:  # pragma: no cover - orjson is in requirements
+    def _dumps_tags(tags) -> str:
+        return json.dumps(tags)
+
 
 class TransactionRecord(db.Model):
     """
@@ -48,13 +61,18 @@ class TransactionRecord(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint("user_id", "hash_key", name="uq_user_txn_hash"),
+        # Covers the per-user date-ordered/ranged scans used by analytics.
+        db.Index("ix_txn_user_date", "user_id", "date"),
     )
 
     @staticmethod
     def _normalize_description(desc: str) -> str:
         if not desc:
             return ""
-        return " ".join(str(desc).strip().upper().split())
+        # split() already drops leading/trailing whitespace, so upper+split+
+        # join is the whole normalization — one pass fewer than the old
+        # strip().upper().split() chain.
+        return " ".join(str(desc).upper().split())
 
     @classmethod
     def compute_hash_key(cls, user_id: int, processed: dict) -> str:
@@ -77,10 +95,15 @@ class TransactionRecord(db.Model):
         return hashlib.sha1(key.encode("utf-8")).hexdigest()
 
     @classmethod
-    def from_processed(cls, user_id: int, processed: dict, *, source: str, bank: str | None = None):
+    def values_from_processed(
+        cls, user_id: int, processed: dict, *, source: str, bank: str | None = None
+    ) -> dict:
         """
-        Build a TransactionRecord instance (not added to the session yet)
-        from a ProcessedTransaction dict.
+        Build the column-value dict for one processed transaction.
+
+        Bulk ingest feeds these dicts straight into a Core executemany
+        INSERT, skipping per-row instrumented-attribute writes that ORM
+        object construction would pay.
         """
         hash_key = cls.compute_hash_key(user_id, processed)
 
@@ -91,23 +114,119 @@ class TransactionRecord(db.Model):
 
         tags = processed.get("tags") or []
 
-        return cls(
-            user_id=user_id,
-            external_id=str(processed.get("transaction_id") or ""),
-            source=source or "unspecified",
-            bank=(bank or None),
-            hash_key=hash_key,
-            date=str(processed.get("date") or ""),
-            description=str(processed.get("description") or ""),
-            amount=amt,
-            currency=str(processed.get("currency") or "INR"),
-            category=str(processed.get("category") or "Unknown"),
-            subcategory=str(processed.get("subcategory") or "Unknown"),
-            merchant_name=processed.get("merchant_name"),
-            charge_type=processed.get("charge_type"),
-            is_p2p=bool(processed.get("is_p2p") or False),
-            p2p_direction=processed.get("p2p_direction"),
-            p2p_counterparty=processed.get("p2p_counterparty"),
-            tags_json=json.dumps(tags),
+        return {
+            "user_id": user_id,
+            "external_id": str(processed.get("transaction_id") or ""),
+            "source": source or "unspecified",
+            "bank": (bank or None),
+            "hash_key": hash_key,
+            "date": str(processed.get("date") or ""),
+            "description": str(processed.get("description") or ""),
+            "amount": amt,
+            "currency": str(processed.get("currency") or "INR"),
+            "category": str(processed.get("category") or "Unknown"),
+            "subcategory": str(processed.get("subcategory") or "Unknown"),
+            "merchant_name": processed.get("merchant_name"),
+            "charge_type": processed.get("charge_type"),
+            "is_p2p": bool(processed.get("is_p2p") or False),
+            "p2p_direction": processed.get("p2p_direction"),
+            "p2p_counterparty": processed.get("p2p_counterparty"),
+            "tags_json": _dumps_tags(tags),
+        }
+
+    @classmethod
+    def from_processed(cls, user_id: int, processed: dict, *, source: str, bank: str | None = None):
+        """
+        Build a TransactionRecord instance (not added to the session yet)
+        from a ProcessedTransaction dict.
+        """
+        return cls(**cls.values_from_processed(user_id, processed, source=source, bank=bank))
+
+
+class TransactionMonthlyAgg(db.Model):
+    """
+    Materialized per-month rollup of transactions, keyed by
+    (user_id, month, category, subcategory).
+
+    Serves month-scoped summaries (reports, dashboards) with one indexed
+    SELECT over a handful of rows instead of re-aggregating the raw
+    transaction table on every request. Rows are refreshed by
+    :meth:`refresh_months` whenever transactions are inserted for a month.
+    """
+
+    __tablename__ = "transaction_monthly_aggs"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)  # YYYY-MM
+    category = db.Column(db.String(120), primary_key=True)
+    subcategory = db.Column(db.String(160), primary_key=True)
+
+    total_spend = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    total_income = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    txn_count = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def refresh_months(cls, user_id: int, months) -> None:
+        """
+        Recompute the rollup rows for the given user and months with a single
+        GROUP BY over the transactions table (delete + reinsert, so the
+        result is exact regardless of which code path inserted the rows).
+        Uses the caller's session/transaction; the caller commits.
+        """
+        # Imported here to keep models free of a hard dependency on the
+        # analytics layer (which itself imports models in its route modules).
+        from statements.analysis import (
+            EXCLUDED_ANALYTICS_CATEGORIES,
+            EXCLUDED_ANALYTICS_CATEGORY_SUBCATEGORY,
+        )
+
+        months = sorted({m for m in months if m})
+        if not months:
+            return
+
+        db.session.flush()
+
+        month_col = func.substr(TransactionRecord.date, 1, 7)
+        query = (
+            db.session.query(
+                month_col.label("month"),
+                TransactionRecord.category,
+                TransactionRecord.subcategory,
+                func.sum(
+                    case((TransactionRecord.amount > 0, TransactionRecord.amount), else_=0)
+                ).label("spend"),
+                func.sum(
+                    case((TransactionRecord.amount < 0, -TransactionRecord.amount), else_=0)
+                ).label("income"),
+                func.count().label("count"),
+            )
+            .filter(
+                TransactionRecord.user_id == user_id,
+                month_col.in_(months),
+                func.length(TransactionRecord.date) >= 10,
+                TransactionRecord.is_p2p.is_(False),
+                TransactionRecord.category.notin_(EXCLUDED_ANALYTICS_CATEGORIES),
+            )
+            .group_by(month_col, TransactionRecord.category, TransactionRecord.subcategory)
+        )
+        for c, s in EXCLUDED_ANALYTICS_CATEGORY_SUBCATEGORY:
+            query = query.filter(
+                not_(and_(TransactionRecord.category == c, TransactionRecord.subcategory == s))
+            )
+
+        cls.query.filter(cls.user_id == user_id, cls.month.in_(months)).delete(
+            synchronize_session=False
         )
+        for row in query:
+            db.session.add(
+                cls(
+                    user_id=user_id,
+                    month=row.month,
+                    category=row.category or "Unknown",
+                    subcategory=row.subcategory or "Unknown",
+                    total_spend=float(row.spend or 0),
+                    total_income=float(row.income or 0),
+                    txn_count=int(row.count or 0),
+                )
+            )
 
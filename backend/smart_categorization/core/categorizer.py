@@ -10,22 +10,70 @@ import json
 import pickle
 import hashlib
 import os
+import sys
+import threading
+from collections import OrderedDict
 from typing import Optional, Tuple, List, Dict
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from datetime import datetime
 
 import tempfile
 import numpy as np
 import warnings
 
+# joblib (bundled with scikit-learn) persists numpy arrays in a form that can
+# be loaded with mmap_mode='r': model coefficients live in OS page cache and
+# are shared across forked/preloaded workers instead of copied per process.
+try:
+    import joblib
+except ImportError:
+    joblib = None
+
 # Cross-platform temp directory (works on Windows, Mac, Linux, Colab)
 _TMPDIR = tempfile.gettempdir()
 
+# Compiled once: _preprocess/_description_hash run per prediction, and
+# re.sub with a string pattern re-hashes the regex cache on every call.
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9\s]')
+_DIGITS_RE = re.compile(r'\d+')
+_NON_ALPHA_RE = re.compile(r'[^a-z\s]')
+# Noise tokens as a frozenset: hashed membership test instead of a list scan
+# per token.
+_NOISE_TOKENS = frozenset(
+    {'payment', 'purchase', 'txn', 'transaction', 'ref', 'upi', 'pg', 'gateway'}
+)
+
+# One-pass lowercase + de-punctuate table for ASCII descriptions (the common
+# case): a-z/0-9 pass through, A-Z map to lowercase, everything else becomes
+# a space. bytes.translate walks the buffer once in C, vs lower() plus a
+# regex substitution each allocating an intermediate string.
+_PREPROCESS_TABLE = bytes.maketrans(
+    bytes(range(256)),
+    bytes(
+        (b + 32) if 65 <= b <= 90
+        else (b if (97 <= b <= 122 or 48 <= b <= 57) else 32)
+        for b in range(256)
+    ),
+)
+
+# Subcategory strings recur constantly (taxonomy plus a handful of LLM
+# variants), so memoize the "recurring" tag predicate instead of paying a
+# lower() allocation and two substring scans on every _generate_tags call.
+_recurring_sub_memo: Dict[str, bool] = {}
+
+
+def _is_recurring_sub(subcategory: str) -> bool:
+    v = _recurring_sub_memo.get(subcategory)
+    if v is None:
+        v = "OTT" in subcategory or "subscription" in subcategory.lower()
+        _recurring_sub_memo[subcategory] = v
+    return v
+
 # ─────────────────────────────────────────────
 # RESULT DATA MODEL
 # ─────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True)
 class CategorizationResult:
     transaction_id: str
     description: str
@@ -44,7 +92,9 @@ class CategorizationResult:
     needs_review: bool = False
     
     def to_dict(self):
-        d = asdict(self)
+        # Slot gather instead of asdict(): asdict deep-copies every nested
+        # dict/list, and these fields are only read for JSON serialization.
+        d = {s: getattr(self, s) for s in self.__slots__}
         d['tags'] = self.tags or []
         return d
 
@@ -128,22 +178,47 @@ class MLCategorizer:
     Trains on seed data; re-trains when user feedback accumulates.
     """
     
+    # Merchant descriptions repeat heavily (a handful of merchants dominate
+    # any statement), so a small LRU over processed text soaks up most
+    # single predictions without touching the vectorizer or model.
+    PREDICTION_CACHE_MAX = 2048
+
     def __init__(self, model_path: str = os.path.join(_TMPDIR, "cat_model.pkl")):
         self.model_path = model_path
         self.vectorizer = None
         self.model = None
         self.label_encoder = None
-        self._load_or_train()
+        self._pred_cache: OrderedDict = OrderedDict()
+        self._pred_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._load_attempted = False
+        self._coef32 = None
+        self._intercept32 = None
+        self._cat_lookup = None
+        self._sub_lookup = None
+        # Model load/training is deferred to ensure_loaded() so requests that
+        # resolve via user override or merchant DB never import scikit-learn
+        # or unpickle the model.
     
     def _preprocess(self, text: str) -> str:
-        text = text.lower()
-        text = re.sub(r'[^a-z0-9\s]', ' ', text)
-        text = re.sub(r'\s+', ' ', text).strip()
-        # Remove common noise tokens
-        noise = ['payment', 'purchase', 'txn', 'transaction', 'ref', 'upi', 'pg', 'gateway']
-        tokens = [t for t in text.split() if t not in noise]
-        return ' '.join(tokens)
+        if text.isascii():
+            cleaned = text.encode().translate(_PREPROCESS_TABLE).decode()
+        else:
+            # Regex fallback keeps the original semantics for the rare
+            # non-ASCII description (each such char becomes a space).
+            cleaned = _NON_ALNUM_RE.sub(' ', text.lower())
+        # split() collapses runs of spaces; remove common noise tokens
+        return ' '.join(t for t in cleaned.split() if t not in _NOISE_TOKENS)
     
+    def ensure_loaded(self):
+        """Load or train the model on first use (see __init__)."""
+        if self._load_attempted:
+            return
+        with self._load_lock:
+            if not self._load_attempted:
+                self._load_or_train()
+                self._load_attempted = True
+
     def _load_or_train(self):
         if os.path.exists(self.model_path):
             try:
@@ -151,44 +226,49 @@ class MLCategorizer:
                 # trigger InconsistentVersionWarning and lead to subtle bugs.
                 # We treat those as "invalid" and retrain on the current
                 # version instead of reusing the old pickle.
-                with open(self.model_path, 'rb') as f:
-                    try:
-                        from sklearn.exceptions import InconsistentVersionWarning  # type: ignore
-                    except Exception:
-                        InconsistentVersionWarning = Warning  # fallback type
+                try:
+                    from sklearn.exceptions import InconsistentVersionWarning  # type: ignore
+                except Exception:
+                    InconsistentVersionWarning = Warning  # fallback type
 
-                    with warnings.catch_warnings(record=True) as caught:
-                        warnings.simplefilter("always", InconsistentVersionWarning)
-                        saved = pickle.load(f)
+                with warnings.catch_warnings(record=True) as caught:
+                    warnings.simplefilter("always", InconsistentVersionWarning)
+                    if joblib is not None:
+                        # mmap keeps the model's numpy buffers in shared,
+                        # read-only pages across preloaded workers.
+                        saved = joblib.load(self.model_path, mmap_mode="r")
+                    else:
+                        with open(self.model_path, 'rb') as f:
+                            saved = pickle.load(f)
 
-                    has_inconsistent = any(
-                        issubclass(w.category, InconsistentVersionWarning)
-                        for w in caught
-                    )
+                has_inconsistent = any(
+                    issubclass(w.category, InconsistentVersionWarning)
+                    for w in caught
+                )
 
-                    # Also check embedded sklearn version if present.
+                # Also check embedded sklearn version if present.
+                sklearn_version = None
+                try:
+                    from sklearn import __version__ as sk_version  # type: ignore
+                    sklearn_version = sk_version
+                except Exception:
                     sklearn_version = None
-                    try:
-                        from sklearn import __version__ as sk_version  # type: ignore
-                        sklearn_version = sk_version
-                    except Exception:
-                        sklearn_version = None
-
-                    saved_version = None
-                    if isinstance(saved, dict):
-                        saved_version = saved.get("sklearn_version")
-
-                    if has_inconsistent or (
-                        sklearn_version is not None
-                        and saved_version is not None
-                        and saved_version != sklearn_version
-                    ):
-                        # Force retrain on mismatch; ignore old pickle.
-                        raise RuntimeError("Incompatible scikit-learn model version; retraining.")
-
-                    self.vectorizer = saved["vectorizer"]
-                    self.model = saved["model"]
-                    self.label_encoder = saved["label_encoder"]
+
+                saved_version = None
+                if isinstance(saved, dict):
+                    saved_version = saved.get("sklearn_version")
+
+                if has_inconsistent or (
+                    sklearn_version is not None
+                    and saved_version is not None
+                    and saved_version != sklearn_version
+                ):
+                    # Force retrain on mismatch; ignore old pickle.
+                    raise RuntimeError("Incompatible scikit-learn model version; retraining.")
+
+                self.vectorizer = saved["vectorizer"]
+                self.model = saved["model"]
+                self.label_encoder = saved["label_encoder"]
                 return
             except Exception:
                 pass
@@ -226,55 +306,153 @@ class MLCategorizer:
             
         )
         self.model.fit(X, y)
-        
+
+        # Cached predictions and inference weights came from the previous
+        # model; drop them. A direct train() also counts as loaded.
+        with self._pred_lock:
+            self._pred_cache.clear()
+        self._coef32 = None
+        self._intercept32 = None
+        self._cat_lookup = None
+        self._sub_lookup = None
+        self._load_attempted = True
+
         # Save (silent-fail: model stays in-memory if path is wrong/unwritable)
         try:
             save_dir = os.path.dirname(self.model_path)
             if save_dir:
                 os.makedirs(save_dir, exist_ok=True)
-            with open(self.model_path, 'wb') as f:
-                pickle.dump(
-                    {
-                        "vectorizer": self.vectorizer,
-                        "model": self.model,
-                        "label_encoder": self.label_encoder,
-                        # Embed the sklearn version used to train this model
-                        # so that future loads can detect mismatches cleanly.
-                        "sklearn_version": sk_version,
-                    },
-                    f,
-                )
+            payload = {
+                "vectorizer": self.vectorizer,
+                "model": self.model,
+                "label_encoder": self.label_encoder,
+                # Embed the sklearn version used to train this model
+                # so that future loads can detect mismatches cleanly.
+                "sklearn_version": sk_version,
+            }
+            if joblib is not None:
+                # Uncompressed joblib keeps arrays mmap-loadable.
+                joblib.dump(payload, self.model_path)
+            else:
+                with open(self.model_path, 'wb') as f:
+                    pickle.dump(payload, f)
         except Exception as e:
             print(f"  WARN: Model save skipped ({e}). Running in-memory; continuing.")
     
     def predict(self, description: str) -> Tuple[str, str, float]:
         """Returns (category, subcategory, confidence)"""
+        self.ensure_loaded()
         if self.model is None:
             return "Shopping", "Electronics", 0.1
-        
+
         processed = self._preprocess(description)
+
+        with self._pred_lock:
+            cached = self._pred_cache.get(processed)
+            if cached is not None:
+                self._pred_cache.move_to_end(processed)
+                return cached
+
         X = self.vectorizer.transform([processed])
 
+        # decision_function gives the raw per-class scores; argmax over them
+        # picks the same class as predict_proba without exponentiating first.
         # Older pickled models from a different scikit-learn version can break
-        # predict_proba (AttributeError: LogisticRegression has no attribute multi_class).
+        # here (AttributeError: LogisticRegression has no attribute multi_class).
         # If that happens, retrain from seed data on the current version.
         try:
-            proba = self.model.predict_proba(X)[0]
+            scores = self.model.decision_function(X)[0]
         except AttributeError:
             # Incompatible or corrupt model → retrain and try once more
             self.train(TRAINING_DATA)
             if self.model is None:
                 return "Shopping", "Electronics", 0.1
-            proba = self.model.predict_proba(X)[0]
-        top_idx = np.argmax(proba)
-        confidence = float(proba[top_idx])
-        
-        label = self.label_encoder.inverse_transform([top_idx])[0]
-        parts = label.split(' > ')
-        category = parts[0] if len(parts) > 0 else "Shopping"
-        subcategory = parts[1] if len(parts) > 1 else "Electronics"
-        
-        return category, subcategory, confidence
+            X = self.vectorizer.transform([processed])
+            scores = self.model.decision_function(X)[0]
+        top_idx = np.argmax(scores)
+        # Numerically-stable softmax, evaluated only for the winning class;
+        # matches predict_proba's value for multinomial logistic regression.
+        m = scores.max()
+        confidence = float(np.exp(scores[top_idx] - m) / np.exp(scores - m).sum())
+
+
+        cats, subs = self._label_lookup()
+        result = (cats[top_idx], subs[top_idx], confidence)
+        with self._pred_lock:
+            self._pred_cache[processed] = result
+            self._pred_cache.move_to_end(processed)
+            while len(self._pred_cache) > self.PREDICTION_CACHE_MAX:
+                self._pred_cache.popitem(last=False)
+        return result
+
+    def _label_lookup(self) -> Tuple[List[str], List[str]]:
+        """
+        (category, subcategory) lists indexed by encoded label id, split
+        once per model. Replaces a label_encoder.inverse_transform call
+        (searchsorted + array alloc) and a str.split per prediction with a
+        plain list index.
+        """
+        if self._cat_lookup is None:
+            cats, subs = [], []
+            for label in self.label_encoder.classes_:
+                parts = label.split(' > ')
+                cats.append(parts[0] if len(parts) > 0 else "Shopping")
+                subs.append(parts[1] if len(parts) > 1 else "Electronics")
+            self._cat_lookup = cats
+            self._sub_lookup = subs
+        return self._cat_lookup, self._sub_lookup
+
+    def _fp32_weights(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        float32 copies of the classifier weights, built once per model.
+        Batch scoring is a plain X @ W.T + b, and fp32 halves the score
+        matrix and memory traffic with no visible effect on the argmax or
+        the (two-decimal) confidence.
+        """
+        if self._coef32 is None:
+            self._coef32 = np.asarray(self.model.coef_, dtype=np.float32)
+            self._intercept32 = np.asarray(self.model.intercept_, dtype=np.float32)
+        return self._coef32, self._intercept32
+
+    def predict_batch(self, descriptions: List[str]) -> List[Tuple[str, str, float]]:
+        """
+        Batched predict(): one vectorizer transform and one classifier pass
+        for all descriptions, instead of a 1-row sparse matrix per call.
+        Returns (category, subcategory, confidence) per input, same order.
+        """
+        if not descriptions:
+            return []
+        self.ensure_loaded()
+        if self.model is None:
+            return [("Shopping", "Electronics", 0.1)] * len(descriptions)
+
+        processed = [self._preprocess(d) for d in descriptions]
+        try:
+            coef, intercept = self._fp32_weights()
+            X = self.vectorizer.transform(processed).astype(np.float32)
+            scores = X @ coef.T + intercept
+        except AttributeError:
+            # Same incompatible-pickle fallback as predict(): retrain and
+            # re-vectorize with the fresh model.
+            self.train(TRAINING_DATA)
+            if self.model is None:
+                return [("Shopping", "Electronics", 0.1)] * len(descriptions)
+            coef, intercept = self._fp32_weights()
+            X = self.vectorizer.transform(processed).astype(np.float32)
+            scores = X @ coef.T + intercept
+
+        top_idx = np.argmax(scores, axis=1)
+        # Row-wise stable softmax for the winning class only (see predict()).
+        m = scores.max(axis=1, keepdims=True)
+        exp_scores = np.exp(scores - m)
+        rows = np.arange(len(processed))
+        confidences = exp_scores[rows, top_idx] / exp_scores.sum(axis=1)
+        cats, subs = self._label_lookup()
+
+        return [
+            (cats[i], subs[i], float(conf))
+            for i, conf in zip(top_idx, confidences)
+        ]
 
 
 # ─────────────────────────────────────────────
@@ -285,85 +463,203 @@ class FeedbackStore:
     """
     Persists user corrections.
     Applies corrections to future similar transactions automatically.
+
+    Corrections use a structure-of-arrays layout: one dict maps
+    pattern_hash → row index, and the row fields live in aligned lists.
+    That keeps each correction to one index plus list slots (instead of a
+    per-row dict of five boxed values) and lets retraining build its
+    (sample, category, subcategory) rows with a single zip.
     """
-    
+
+    # Corrections are appended to a sidecar JSONL log (O(1) bytes per
+    # correction); the full JSON snapshot is rewritten atomically only every
+    # SNAPSHOT_EVERY appends instead of on every record_correction.
+    SNAPSHOT_EVERY = 100
+
     def __init__(self, store_path: str = os.path.join(_TMPDIR, "feedback_store.json")):
         self.store_path = store_path
-        self.corrections: Dict[str, dict] = {}  # pattern_hash → correction
+        self.log_path = store_path + ".log"
+        self._hash_to_idx: Dict[str, int] = {}  # pattern_hash → row index
+        self._samples: List[str] = []
+        self._cats: List[str] = []
+        self._subs: List[str] = []
+        self._counts: List[int] = []
+        self._pending_appends = 0
         self.merchant_overrides: Dict[str, dict] = {}  # merchant_name → override
         self._load()
-    
+
     def _load(self):
         if os.path.exists(self.store_path):
             with open(self.store_path) as f:
                 data = json.load(f)
-                self.corrections = data.get("corrections", {})
-                self.merchant_overrides = data.get("merchant_overrides", {})
-    
+            self.merchant_overrides = {
+                sys.intern(k): v for k, v in data.get("merchant_overrides", {}).items()
+            }
+            corrections = data.get("corrections", {})
+            if isinstance(corrections, dict) and "hashes" in corrections:
+                hashes = corrections.get("hashes", [])
+                self._hash_to_idx = {h: i for i, h in enumerate(hashes)}
+                self._samples = list(corrections.get("samples", []))
+                self._cats = list(corrections.get("categories", []))
+                self._subs = list(corrections.get("subcategories", []))
+                self._counts = list(corrections.get("counts", []))
+            else:
+                # Migrate the older pattern_hash → {fields} layout in place.
+                for pattern_hash, c in corrections.items():
+                    self._hash_to_idx[pattern_hash] = len(self._samples)
+                    self._samples.append(c.get("description_sample", ""))
+                    self._cats.append(c.get("category", ""))
+                    self._subs.append(c.get("subcategory", ""))
+                    self._counts.append(int(c.get("count", 1)))
+            if any(len(h) != 16 for h in self._hash_to_idx):
+                # Stores written before the blake2b switch are keyed by md5;
+                # re-key from the stored samples so corrections keep matching.
+                self._hash_to_idx = {
+                    self._description_hash(s): i for i, s in enumerate(self._samples)
+                }
+        # Replay the tail log: entries recorded since the last snapshot.
+        if os.path.exists(self.log_path):
+            with open(self.log_path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line from a crashed writer
+                    if entry.get("op") == "correction":
+                        self._apply_correction(
+                            entry["hash"], entry["sample"],
+                            entry["cat"], entry["sub"],
+                        )
+                    elif entry.get("op") == "merchant":
+                        self.merchant_overrides[sys.intern(entry["key"])] = {
+                            "category": entry["cat"],
+                            "subcategory": entry["sub"],
+                        }
+                    self._pending_appends += 1
+
+    def _apply_correction(self, pattern_hash: str, sample: str,
+                          category: str, subcategory: str):
+        idx = self._hash_to_idx.get(pattern_hash)
+        if idx is None:
+            self._hash_to_idx[pattern_hash] = len(self._samples)
+            self._samples.append(sample)
+            self._cats.append(category)
+            self._subs.append(subcategory)
+            self._counts.append(1)
+        else:
+            self._samples[idx] = sample
+            self._cats[idx] = category
+            self._subs[idx] = subcategory
+            self._counts[idx] += 1
+
+    def _append_log(self, entries: List[dict]):
+        save_dir = os.path.dirname(self.log_path)
+        if save_dir:
+            os.makedirs(save_dir, exist_ok=True)
+        with open(self.log_path, 'a') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+        self._pending_appends += len(entries)
+        if self._pending_appends >= self.SNAPSHOT_EVERY:
+            self._save()
+
     def _save(self):
+        """Write the full snapshot atomically and truncate the tail log."""
         try:
             save_dir = os.path.dirname(self.store_path)
             if save_dir:
                 os.makedirs(save_dir, exist_ok=True)
-            with open(self.store_path, 'w') as f:
+            hashes = [None] * len(self._samples)
+            for h, i in self._hash_to_idx.items():
+                hashes[i] = h
+            tmp_path = self.store_path + ".tmp"
+            with open(tmp_path, 'w') as f:
                 json.dump({
-                    "corrections": self.corrections,
+                    "corrections": {
+                        "hashes": hashes,
+                        "samples": self._samples,
+                        "categories": self._cats,
+                        "subcategories": self._subs,
+                        "counts": self._counts,
+                    },
                     "merchant_overrides": self.merchant_overrides
-                }, f, indent=2)
+                }, f)
+            os.replace(tmp_path, self.store_path)
+            if os.path.exists(self.log_path):
+                os.remove(self.log_path)
+            self._pending_appends = 0
         except Exception as e:
             print(f"  WARN: Feedback save skipped ({e}). Corrections active in-memory only.")
-    
+
     def _description_hash(self, description: str) -> str:
         """Normalize description to a pattern key."""
-        cleaned = re.sub(r'\d+', '', description.lower())
-        cleaned = re.sub(r'[^a-z\s]', '', cleaned).strip()
+        cleaned = _DIGITS_RE.sub('', description.lower())
+        cleaned = _NON_ALPHA_RE.sub('', cleaned).strip()
         tokens = sorted(set(cleaned.split()))[:5]  # top 5 unique tokens
-        return hashlib.md5(' '.join(tokens).encode()).hexdigest()
-    
+        # Not security-sensitive: an 8-byte blake2b digest is plenty for a
+        # per-user pattern table and halves the key size md5 produced.
+        return hashlib.blake2b(' '.join(tokens).encode(), digest_size=8).hexdigest()
+
     def record_correction(self, description: str, merchant_name: Optional[str],
                           old_category: str, new_category: str, new_subcategory: str):
         """User corrects a transaction → store for future use."""
         pattern_hash = self._description_hash(description)
-        correction = {
-            "description_sample": description[:100],
-            "category": new_category,
-            "subcategory": new_subcategory,
-            "corrected_at": datetime.now().isoformat(),
-            "count": self.corrections.get(pattern_hash, {}).get("count", 0) + 1
-        }
-        self.corrections[pattern_hash] = correction
-        
-        # Also store merchant-level override
+        sample = description[:100]
+        self._apply_correction(pattern_hash, sample, new_category, new_subcategory)
+        entries = [{
+            "op": "correction", "hash": pattern_hash, "sample": sample,
+            "cat": new_category, "sub": new_subcategory,
+        }]
+
+        # Also store merchant-level override. Interning the lowercased name
+        # makes the per-request lookup in check_override effectively
+        # pointer-equality for repeat merchants.
         if merchant_name:
-            self.merchant_overrides[merchant_name.lower()] = {
+            key = sys.intern(merchant_name.lower())
+            self.merchant_overrides[key] = {
                 "category": new_category,
                 "subcategory": new_subcategory
             }
-        
-        self._save()
-    
+            entries.append({
+                "op": "merchant", "key": key,
+                "cat": new_category, "sub": new_subcategory,
+            })
+
+        try:
+            self._append_log(entries)
+        except Exception as e:
+            print(f"  WARN: Feedback save skipped ({e}). Corrections active in-memory only.")
+
     def check_override(self, description: str, merchant_name: Optional[str] = None
                        ) -> Optional[Tuple[str, str]]:
         """
         Check if there's a user override for this transaction.
         Returns (category, subcategory) or None.
         """
-        # Merchant-level override (highest priority)
-        if merchant_name and merchant_name.lower() in self.merchant_overrides:
-            o = self.merchant_overrides[merchant_name.lower()]
-            return o["category"], o["subcategory"]
-        
+        # Merchant-level override (highest priority); lowercase once, intern
+        # to match the keys stored by record_correction.
+        if merchant_name:
+            o = self.merchant_overrides.get(sys.intern(merchant_name.lower()))
+            if o is not None:
+                return o["category"], o["subcategory"]
+
         # Pattern-level override
-        pattern_hash = self._description_hash(description)
-        if pattern_hash in self.corrections:
-            c = self.corrections[pattern_hash]
-            return c["category"], c["subcategory"]
-        
+        idx = self._hash_to_idx.get(self._description_hash(description))
+        if idx is not None:
+            return self._cats[idx], self._subs[idx]
+
         return None
-    
+
+    def training_rows(self) -> List[Tuple[str, str, str]]:
+        """All corrections as (description_sample, category, subcategory)."""
+        return list(zip(self._samples, self._cats, self._subs))
+
     def retrain_needed(self, threshold: int = 20) -> bool:
         """Returns True if enough corrections accumulated to warrant retraining."""
-        return len(self.corrections) >= threshold
+        return len(self._hash_to_idx) >= threshold
 
 
 # ─────────────────────────────────────────────
@@ -389,16 +685,20 @@ class SmartCategorizationEngine:
     def categorize(self, description: str, amount: float,
                    transaction_id: Optional[str] = None,
                    use_llm_only: bool = False,
-                   enable_llm_fallback: bool = True) -> CategorizationResult:
+                   enable_llm_fallback: bool = True,
+                   ml_prediction: Optional[Tuple[str, str, float]] = None) -> CategorizationResult:
         """
         Categorize a transaction.
         When use_llm_only=True (e.g. for PDF statements), skip merchant DB and ML,
         and use the LLM directly for better accuracy on bank narrations.
         When enable_llm_fallback=False, we rely purely on merchant DB + ML
         (no best-effort LLM refinement step).
+        ml_prediction is an optional precomputed (category, subcategory,
+        confidence) tuple from MLCategorizer.predict_batch; batch ingest uses
+        it to replace N single-row model calls with one vectorized pass.
         """
-        txn_id = transaction_id or hashlib.md5(
-            f"{description}{amount}".encode()).hexdigest()[:8]
+        txn_id = transaction_id or hashlib.blake2b(
+            f"{description}{amount}".encode(), digest_size=4).hexdigest()
         
         # 1. Find merchant from DB (skipped when use_llm_only)
         merchant = None if use_llm_only else self.find_merchant(description)
@@ -464,7 +764,10 @@ class SmartCategorizationEngine:
             )
         
         # 4. ML model fallback
-        cat, subcat, confidence = self.ml.predict(description)
+        if ml_prediction is not None:
+            cat, subcat, confidence = ml_prediction
+        else:
+            cat, subcat, confidence = self.ml.predict(description)
 
         # Threshold for when we consider ML "low confidence" and should lean on LLM.
         # Higher threshold => LLM used more often.
@@ -516,14 +819,7 @@ class SmartCategorizationEngine:
     
     def _incremental_retrain(self):
         """Add user corrections to training set and retrain model."""
-        extra_data = []
-        for _, correction in self.feedback.corrections.items():
-            extra_data.append((
-                correction["description_sample"],
-                correction["category"],
-                correction["subcategory"]
-            ))
-        combined = TRAINING_DATA + extra_data
+        combined = TRAINING_DATA + self.feedback.training_rows()
         self.ml.train(combined)
     
     def _generate_tags(self, category: str, subcategory: str,
@@ -538,6 +834,6 @@ class SmartCategorizationEngine:
                 tags.append("offline-purchase")
         if amount > 10000:
             tags.append("large-expense")
-        if "OTT" in subcategory or "subscription" in subcategory.lower():
+        if _is_recurring_sub(subcategory):
             tags.append("recurring")
         return tags
\ No newline at end of file
@@ -15,6 +15,21 @@ from dataclasses import dataclass, asdict, field
 from datetime import datetime
 from enum import Enum
 
+# Compiled once at import: slugs category names into ids in create_category.
+_CAT_ID_RE = re.compile(r'[^a-z0-9]')
+
+# orjson writes the category store several times faster than stdlib json;
+# _save runs on every category/rule/budget mutation.  Fall back to stdlib
+# when the wheel is unavailable.
+try:
+    import orjson
+
+    def _dumps_store(data) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+except ImportError:  # pragma: no cover - orjson is in requirements
+    def _dumps_store(data) -> bytes:
+        return json.dumps(data, indent=2).encode()
+
 
 class RuleType(str, Enum):
     KEYWORD = "keyword"          # Description contains keyword
@@ -34,6 +49,44 @@ class TagRule:
     value: Any              # keyword string, merchant name, (min,max), regex pattern etc.
     priority: int = 5       # 1=highest, 10=lowest
     is_exclusive: bool = False  # If True, don't apply other rules after this
+    # REGEX rules: pattern compiled once at load/creation instead of going
+    # through re's string-keyed cache on every match_transaction call.
+    compiled: Optional[re.Pattern] = field(default=None, compare=False, repr=False)
+    # String-valued rules: value lowered once here instead of per call.
+    value_lower: Optional[str] = field(default=None, compare=False, repr=False)
+
+
+# Relative evaluation cost per rule type: numeric comparisons are near-free,
+# substring checks cheap, regex searches the most expensive.  Used as a
+# secondary sort key so, within a priority tier, an exclusive rule that
+# matches via a cheap check short-circuits before any regex runs.
+_RULE_COST = {
+    RuleType.AMOUNT_RANGE: 0,
+    RuleType.AMOUNT_ABOVE: 0,
+    RuleType.AMOUNT_BELOW: 0,
+    RuleType.DAY_OF_WEEK: 0,
+    RuleType.KEYWORD: 1,
+    RuleType.MERCHANT: 1,
+    RuleType.ORIGINAL_CATEGORY: 1,
+    RuleType.REGEX: 2,
+}
+
+
+def _compile_rule(rule: TagRule) -> TagRule:
+    if rule.rule_type == RuleType.REGEX:
+        rule.compiled = re.compile(rule.value, re.I)
+    elif rule.rule_type in (RuleType.KEYWORD, RuleType.MERCHANT,
+                            RuleType.ORIGINAL_CATEGORY):
+        rule.value_lower = rule.value.lower()
+    return rule
+
+
+def _sort_rules(cat: "CustomCategory") -> None:
+    """Keep cat.rules ordered by (priority, evaluation cost) so
+    match_transaction can iterate directly instead of re-sorting each call.
+    Scores are order-independent unless an exclusive rule matches, in which
+    case cheaper same-priority rules are counted first."""
+    cat.rules.sort(key=lambda r: (r.priority, _RULE_COST.get(r.rule_type, 1)))
 
 @dataclass
 class CustomCategory:
@@ -75,40 +128,61 @@ class CustomCategoryBuilder:
                 data = json.load(f)
                 for cat_id, cat_data in data.items():
                     rules = [
-                        TagRule(
+                        _compile_rule(TagRule(
                             rule_id=r["rule_id"],
                             rule_type=RuleType(r["rule_type"]),
                             value=r["value"],
                             priority=r.get("priority", 5),
                             is_exclusive=r.get("is_exclusive", False)
-                        )
+                        ))
                         for r in cat_data.get("rules", [])
                     ]
                     cat_data["rules"] = rules
-                    self.categories[cat_id] = CustomCategory(**cat_data)
+                    cat = CustomCategory(**cat_data)
+                    _sort_rules(cat)
+                    self.categories[cat_id] = cat
     
     def _save(self):
+        # Flat attribute projection instead of asdict(): asdict recurses
+        # into every rule and deep-copies all field values just to build
+        # dicts that are serialized and thrown away.  The key set mirrors
+        # what _load feeds back into CustomCategory(**cat_data).
         data = {}
         for cat_id, cat in self.categories.items():
-            cat_dict = cat.to_dict()
-            cat_dict["rules"] = [
-                {
-                    "rule_id": r["rule_id"],
-                    "rule_type": r["rule_type"],
-                    "value": r["value"],
-                    "priority": r["priority"],
-                    "is_exclusive": r["is_exclusive"]
-                }
-                for r in cat_dict["rules"]
-            ]
-            data[cat_id] = cat_dict
+            data[cat_id] = {
+                "category_id": cat.category_id,
+                "name": cat.name,
+                "description": cat.description,
+                "color": cat.color,
+                "icon": cat.icon,
+                "rules": [
+                    {
+                        "rule_id": r.rule_id,
+                        "rule_type": r.rule_type,
+                        "value": r.value,
+                        "priority": r.priority,
+                        "is_exclusive": r.is_exclusive
+                    }
+                    for r in cat.rules
+                ],
+                "created_at": cat.created_at,
+                "updated_at": cat.updated_at,
+                "is_active": cat.is_active,
+                "budget_limit": cat.budget_limit,
+                "parent_category": cat.parent_category,
+                "tags": cat.tags,
+            }
         
         try:
             save_dir = os.path.dirname(self.store_path)
             if save_dir:
                 os.makedirs(save_dir, exist_ok=True)
-            with open(self.store_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            # Write-then-rename so a crash mid-write never leaves a torn
+            # store behind; os.replace is atomic on the same filesystem.
+            tmp_path = self.store_path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(_dumps_store(data))
+            os.replace(tmp_path, self.store_path)
         except Exception as e:
             print(f"  WARN: Custom categories save skipped ({e}). Active in-memory only.")
     
@@ -185,18 +259,18 @@ class CustomCategoryBuilder:
                         parent_category: Optional[str] = None) -> CustomCategory:
         """Create a new custom category with rules."""
         
-        cat_id = re.sub(r'[^a-z0-9]', '_', name.lower())[:30]
+        cat_id = _CAT_ID_RE.sub('_', name.lower())[:30]
         now = datetime.now().isoformat()
         
         tag_rules = []
         for i, rule in enumerate(rules):
-            tag_rules.append(TagRule(
+            tag_rules.append(_compile_rule(TagRule(
                 rule_id=f"{cat_id}_rule_{i}",
                 rule_type=rule["type"],
                 value=rule["value"],
                 priority=rule.get("priority", 5),
                 is_exclusive=rule.get("is_exclusive", False)
-            ))
+            )))
         
         cat = CustomCategory(
             category_id=cat_id,
@@ -212,7 +286,8 @@ class CustomCategoryBuilder:
             parent_category=parent_category,
             tags=tags or []
         )
-        
+        _sort_rules(cat)
+
         self.categories[cat_id] = cat
         self._save()
         return cat
@@ -225,7 +300,8 @@ class CustomCategoryBuilder:
         
         cat = self.categories[category_id]
         rule_id = f"{category_id}_rule_{len(cat.rules)}"
-        cat.rules.append(TagRule(rule_id, rule_type, value, priority))
+        cat.rules.append(_compile_rule(TagRule(rule_id, rule_type, value, priority)))
+        _sort_rules(cat)
         cat.updated_at = datetime.now().isoformat()
         self._save()
         return True
@@ -240,8 +316,10 @@ class CustomCategoryBuilder:
         Returns the highest-priority matching CustomCategory or None.
         """
         desc_lower = description.lower()
+        merchant_lower = merchant_name.lower() if merchant_name else None
+        original_lower = original_category.lower() if original_category else None
         matches = []
-        
+
         for cat_id, cat in self.categories.items():
             if not cat.is_active:
                 continue
@@ -249,15 +327,16 @@ class CustomCategoryBuilder:
             score = 0
             matched_rules = 0
             
-            for rule in sorted(cat.rules, key=lambda r: r.priority):
+            # Rules are kept priority-sorted at load/creation time.
+            for rule in cat.rules:
                 rule_matched = False
                 
                 if rule.rule_type == RuleType.KEYWORD:
-                    rule_matched = rule.value.lower() in desc_lower
-                
+                    rule_matched = rule.value_lower in desc_lower
+
                 elif rule.rule_type == RuleType.MERCHANT:
-                    if merchant_name:
-                        rule_matched = rule.value.lower() in merchant_name.lower()
+                    if merchant_lower:
+                        rule_matched = rule.value_lower in merchant_lower
                 
                 elif rule.rule_type == RuleType.AMOUNT_RANGE:
                     min_amt, max_amt = rule.value
@@ -270,11 +349,11 @@ class CustomCategoryBuilder:
                     rule_matched = amount < rule.value
                 
                 elif rule.rule_type == RuleType.REGEX:
-                    rule_matched = bool(re.search(rule.value, desc_lower, re.I))
+                    rule_matched = rule.compiled.search(desc_lower) is not None
                 
                 elif rule.rule_type == RuleType.ORIGINAL_CATEGORY:
-                    if original_category:
-                        rule_matched = rule.value.lower() in original_category.lower()
+                    if original_lower:
+                        rule_matched = rule.value_lower in original_lower
                 
                 if rule_matched:
                     matched_rules += 1
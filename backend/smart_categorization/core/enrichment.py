@@ -5,10 +5,16 @@ Handles unknown merchants via fuzzy matching + external enrichment.
 """
 
 import re
+import threading
+from collections import OrderedDict
 from typing import Optional, Dict, Tuple
 from dataclasses import dataclass
 from difflib import SequenceMatcher
 
+# Compiled once at import; _extract_name runs per uncached transaction.
+_UPI_SUFFIX_RE = re.compile(
+    r'(upi|payment|purchase|order|txn|ref|transfer|bill|pay).*', re.I)
+
 
 @dataclass
 class EnrichedMerchant:
@@ -108,32 +114,58 @@ class MerchantEnrichmentEngine:
     """
     Enriches raw transaction descriptions with merchant metadata.
     """
-    
+
+    ENRICH_CACHE_MAX = 1024
+
     def __init__(self):
-        from ..data.merchant_db import find_merchant, MERCHANT_LOOKUP
+        from ..data.merchant_db import find_merchant, MERCHANT_LOOKUP, MERCHANT_DB
         self.find_merchant = find_merchant
         self.merchant_lookup = MERCHANT_LOOKUP
+        # Flattened (lowercased alias, record) pairs, built once so
+        # _fuzzy_match doesn't re-lower every alias on every call.
+        self._alias_records = [
+            (alias.lower(), record)
+            for record in MERCHANT_DB
+            for alias in record.aliases
+        ]
+        # LRU over (description, category, subcategory): enrichment is
+        # deterministic per key (amount never reaches the output), and
+        # statement imports repeat the same narration constantly.
+        self._enrich_cache: "OrderedDict[Tuple[str, str, str], EnrichedMerchant]" = OrderedDict()
+        self._enrich_lock = threading.Lock()
     
     def enrich(self, description: str, predicted_category: str,
                predicted_subcategory: str, amount: float) -> EnrichedMerchant:
         """
         Main enrichment method. Returns full EnrichedMerchant object.
         """
-        
+        cache_key = (description, predicted_category, predicted_subcategory)
+        with self._enrich_lock:
+            cached = self._enrich_cache.get(cache_key)
+            if cached is not None:
+                self._enrich_cache.move_to_end(cache_key)
+                return cached
+
         # Try exact / partial match
         merchant = self.find_merchant(description)
-        
+
         if merchant:
-            return self._enrich_from_record(merchant, 0.95, "merchant_db")
-        
-        # Try fuzzy match
-        fuzzy = self._fuzzy_match(description)
-        if fuzzy and fuzzy[1] > 0.75:
-            return self._enrich_from_record(fuzzy[0], fuzzy[1] * 0.85, "fuzzy_match")
-        
-        # Infer from category
-        return self._infer_from_category(
-            description, predicted_category, predicted_subcategory, amount)
+            result = self._enrich_from_record(merchant, 0.95, "merchant_db")
+        else:
+            # Try fuzzy match
+            fuzzy = self._fuzzy_match(description)
+            if fuzzy and fuzzy[1] > 0.75:
+                result = self._enrich_from_record(fuzzy[0], fuzzy[1] * 0.85, "fuzzy_match")
+            else:
+                # Infer from category
+                result = self._infer_from_category(
+                    description, predicted_category, predicted_subcategory, amount)
+
+        with self._enrich_lock:
+            self._enrich_cache[cache_key] = result
+            if len(self._enrich_cache) > self.ENRICH_CACHE_MAX:
+                self._enrich_cache.popitem(last=False)
+        return result
     
     def _enrich_from_record(self, merchant, confidence: float,
                              source: str) -> EnrichedMerchant:
@@ -170,22 +202,32 @@ class MerchantEnrichmentEngine:
     def _fuzzy_match(self, description: str):
         """Fuzzy match description against known merchant aliases."""
         desc_lower = description.lower()
-        best_score = 0
-        best_merchant = None
-        
+
         # Extract first meaningful token (merchant names usually at start)
         words = desc_lower.split()[:4]
         short_desc = ' '.join(words)
-        
-        from ..data.merchant_db import MERCHANT_DB
-        for record in MERCHANT_DB:
-            for alias in record.aliases:
-                score = SequenceMatcher(None, short_desc, alias.lower()).ratio()
-                if score > best_score:
-                    best_score = score
-                    best_merchant = record
-        
-        if best_merchant and best_score > 0.6:
+
+        # One matcher with seq2 pinned to the description: SequenceMatcher
+        # caches its index of seq2, so only the short alias changes per
+        # iteration.  real_quick_ratio/quick_ratio are cheap upper bounds
+        # on ratio(), so the full quadratic match only runs for aliases
+        # that could still beat the current best.
+        matcher = SequenceMatcher(None)
+        matcher.set_seq2(short_desc)
+        best_score = 0.6
+        best_merchant = None
+
+        for alias, record in self._alias_records:
+            matcher.set_seq1(alias)
+            if (matcher.real_quick_ratio() <= best_score
+                    or matcher.quick_ratio() <= best_score):
+                continue
+            score = matcher.ratio()
+            if score > best_score:
+                best_score = score
+                best_merchant = record
+
+        if best_merchant:
             return best_merchant, best_score
         return None
     
@@ -233,10 +275,7 @@ class MerchantEnrichmentEngine:
     def _extract_name(self, description: str) -> str:
         """Extract likely merchant name from raw description."""
         # Remove common UPI suffixes
-        cleaned = re.sub(
-            r'(upi|payment|purchase|order|txn|ref|transfer|bill|pay).*',
-            '', description, flags=re.I
-        ).strip()
+        cleaned = _UPI_SUFFIX_RE.sub('', description).strip()
         # Title case first 3 words
         words = cleaned.split()[:3]
         return ' '.join(w.capitalize() for w in words) if words else description[:30]
@@ -15,7 +15,7 @@ import tempfile
 _TMPDIR = tempfile.gettempdir()
 
 from typing import Optional, List, Dict, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from datetime import datetime
 
 
@@ -77,7 +77,9 @@ class ProcessedTransaction:
     processed_at: str
     
     def to_dict(self):
-        return asdict(self)
+        # Shallow copy instead of asdict(): asdict deep-copies split_items /
+        # tags, and callers only read the dict to build JSON / DB rows.
+        return self.__dict__.copy()
 
 
 class SmartCategorizationPipeline:
@@ -109,20 +111,22 @@ class SmartCategorizationPipeline:
     
     def process(self, transaction: Transaction,
                 use_llm_only: bool = False,
-                enable_llm_fallback: bool | None = None) -> ProcessedTransaction:
+                enable_llm_fallback: bool | None = None,
+                ml_prediction=None) -> ProcessedTransaction:
         """
         Process a single transaction through the full pipeline.
         When use_llm_only=True (e.g. for PDF statements), categorization uses
         DeepSeek LLM only, skipping merchant DB and ML model.
+        ml_prediction is an optional precomputed ML tuple (see process_many).
         Returns a fully enriched ProcessedTransaction.
         """
-        
+
         if enable_llm_fallback is None:
             enable_llm_fallback = True
 
         desc = transaction.description
         amt = abs(transaction.amount)  # Work with positive amounts
-        
+
         # ── STEP 1: Base Categorization ─────────────────────────────────────
         cat_result = self.categorizer.categorize(
             description=desc,
@@ -130,6 +134,7 @@ class SmartCategorizationPipeline:
             transaction_id=transaction.transaction_id,
             use_llm_only=use_llm_only,
             enable_llm_fallback=enable_llm_fallback,
+            ml_prediction=ml_prediction,
         )
         
         # ── STEP 1b: P2P Detection (runs BEFORE enrichment, can override) ───
@@ -352,6 +357,22 @@ class SmartCategorizationPipeline:
             processed_at=datetime.now().isoformat(),
         )
     
+    def process_many(self, transactions: List[Transaction],
+                     enable_llm_fallback: bool = False):
+        """
+        Generator over process() with the ML step batched: one vectorize +
+        predict pass for every description up front, then the usual per-row
+        priority chain (override / merchant DB still win). CSV ingest uses
+        this so N rows cost one classifier call instead of N.
+        """
+        preds = self.categorizer.ml.predict_batch(
+            [t.description for t in transactions]
+        )
+        for txn, pred in zip(transactions, preds):
+            yield self.process(
+                txn, enable_llm_fallback=enable_llm_fallback, ml_prediction=pred
+            )
+
     def process_batch(self, transactions: List[Transaction],
                       verbose: bool = True) -> List[ProcessedTransaction]:
         """Process multiple transactions."""
@@ -21,9 +21,12 @@ def _get_client() -> OpenAI | None:
     api_key = os.getenv("DEEPSEEK_API_KEY")
     if not api_key:
         return None
+    from utils.http_client import get_http_client
     base_url = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
     timeout_s = int(os.getenv("LLM_TIMEOUT_SECONDS", "180"))
-    _client = OpenAI(api_key=api_key, base_url=base_url, timeout=timeout_s)
+    _client = OpenAI(
+        api_key=api_key, base_url=base_url, timeout=timeout_s, http_client=get_http_client()
+    )
     return _client
 
 
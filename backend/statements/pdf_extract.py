@@ -1,13 +1,25 @@
 from __future__ import annotations
 
-from typing import List
+from typing import IO, List, Union
 
+# Sources may be a filesystem path or any seekable binary file-like object
+# (e.g. an upload spooled in memory); both pdfplumber and pypdf accept either.
+PdfSource = Union[str, IO[bytes]]
 
-def extract_text_pdfplumber(pdf_path: str, max_pages: int | None = None) -> str:
+
+def _rewind(pdf_src: PdfSource) -> None:
+    if hasattr(pdf_src, "seek"):
+        pdf_src.seek(0)
+
+
+def extract_text_pdfplumber(
+    pdf_src: PdfSource, max_pages: int | None = None, max_chars: int | None = None
+) -> str:
     import pdfplumber
 
     lines: List[str] = []
-    with pdfplumber.open(pdf_path) as pdf:
+    total_chars = 0
+    with pdfplumber.open(pdf_src) as pdf:
         total = len(pdf.pages)
         n = min(total, max_pages) if max_pages else total
         for i in range(n):
@@ -15,37 +27,55 @@ def extract_text_pdfplumber(pdf_path: str, max_pages: int | None = None) -> str:
             text = page.extract_text() or ""
             if text:
                 lines.append(text)
+                total_chars += len(text)
+                # Stop extracting once we have enough text for the caller's
+                # budget; remaining pages would be truncated anyway.
+                if max_chars is not None and total_chars >= max_chars:
+                    break
     return "\n".join(lines)
 
 
-def extract_text_pypdf(pdf_path: str, max_pages: int | None = None) -> str:
+def extract_text_pypdf(
+    pdf_src: PdfSource, max_pages: int | None = None, max_chars: int | None = None
+) -> str:
     from pypdf import PdfReader
 
-    reader = PdfReader(pdf_path)
+    reader = PdfReader(pdf_src)
     total = len(reader.pages)
     n = min(total, max_pages) if max_pages else total
     out: List[str] = []
+    total_chars = 0
     for i in range(n):
-        out.append(reader.pages[i].extract_text() or "")
+        text = reader.pages[i].extract_text() or ""
+        out.append(text)
+        total_chars += len(text)
+        if max_chars is not None and total_chars >= max_chars:
+            break
     return "\n".join(out)
 
 
-def extract_text(pdf_path: str, max_pages: int | None = 20) -> str:
+def extract_text(
+    pdf_src: PdfSource, max_pages: int | None = 20, max_chars: int | None = None
+) -> str:
     """
     Best-effort text extraction. For scanned PDFs (images), this will likely
     return empty text; OCR would be needed (not included yet).
+
+    Accepts a path or a seekable binary stream; pass ``max_chars`` to stop
+    walking pages once enough text has been collected.
     """
     try:
-        text = extract_text_pdfplumber(pdf_path, max_pages=max_pages)
+        text = extract_text_pdfplumber(pdf_src, max_pages=max_pages, max_chars=max_chars)
         if text and text.strip():
             return text
     except Exception:
         pass
 
-    return extract_text_pypdf(pdf_path, max_pages=max_pages)
+    _rewind(pdf_src)
+    return extract_text_pypdf(pdf_src, max_pages=max_pages, max_chars=max_chars)
 
 
-def extract_tables(pdf_path: str, max_pages: int | None = 20) -> List[List[List[str | None]]]:
+def extract_tables(pdf_src: PdfSource, max_pages: int | None = 20) -> List[List[List[str | None]]]:
     """
     Extract tables from PDF using pdfplumber.
     Returns a list of tables; each table is a list of rows; each row is a list of cell strings.
@@ -54,7 +84,7 @@ def extract_tables(pdf_path: str, max_pages: int | None = 20) -> List[List[List[
     import pdfplumber
 
     all_tables: List[List[List[str | None]]] = []
-    with pdfplumber.open(pdf_path) as pdf:
+    with pdfplumber.open(pdf_src) as pdf:
         total = len(pdf.pages)
         n = min(total, max_pages) if max_pages else total
         for i in range(n):
@@ -69,4 +99,3 @@ def extract_tables(pdf_path: str, max_pages: int | None = 20) -> List[List[List[
                     ]
                     all_tables.append(rows)
     return all_tables
-
@@ -20,7 +20,7 @@ from .parse_lines import (
 from .pdf_extract import extract_text, extract_tables
 from .llm_fallback import parse_bank_statement_with_llm, parse_bank_statement_with_llm_chunked
 from models import db
-from models.transaction_model import TransactionRecord
+from models.transaction_model import TransactionRecord, TransactionMonthlyAgg
 from models.user_model import User
 
 
@@ -185,6 +185,7 @@ def analyze_pdf_statement():
 
         # Persist processed transactions for the current user (id from JWT)
         user_id = int(get_jwt_identity())
+        inserted_months = set()
         for row in processed:
             # Build record and check for duplicates via hash_key
             record = TransactionRecord.from_processed(
@@ -199,6 +200,9 @@ def analyze_pdf_statement():
             if exists:
                 continue
             db.session.add(record)
+            inserted_months.add(record.date[:7])
+        if inserted_months:
+            TransactionMonthlyAgg.refresh_months(user_id, inserted_months)
         db.session.commit()
         time_aggs = compute_time_aggregates(processed)
         summary = pipeline.get_summary(processed_objs)
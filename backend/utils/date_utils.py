@@ -0,0 +1,28 @@
+from datetime import date, timedelta
+
+# Helpers for working with the ISO date strings (YYYY-MM-DD) stored on
+# TransactionRecord.date.
+
+
+def prefix_date_range(prefix: str) -> tuple[str, str]:
+    """Convert a date prefix (YYYY, YYYY-MM or YYYY-MM-DD) into a half-open
+    [start, end) range of ISO date strings.
+
+    ISO strings sort lexicographically, so `date >= start AND date < end`
+    matches exactly the rows `date LIKE 'prefix%'` would — but the range form
+    can use a B-tree index instead of scanning every row.
+    """
+    prefix = prefix.strip()
+    if len(prefix) == 4:  # YYYY
+        year = int(prefix)
+        return f"{year:04d}-01-01", f"{year + 1:04d}-01-01"
+    if len(prefix) == 7:  # YYYY-MM
+        year, month = int(prefix[:4]), int(prefix[5:7])
+        if month == 12:
+            year, month = year + 1, 1
+        else:
+            month += 1
+        return f"{prefix}-01", f"{year:04d}-{month:02d}-01"
+    # YYYY-MM-DD: a single day
+    d = date.fromisoformat(prefix)
+    return prefix, (d + timedelta(days=1)).isoformat()
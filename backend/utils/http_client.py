@@ -0,0 +1,58 @@
+import asyncio
+import os
+import threading
+import weakref
+from typing import Optional
+
+import httpx
+
+# One warm httpx.Client shared by every OpenAI-compatible SDK client in the
+# process.  The SDK otherwise builds its own transport per client object, so
+# module reloads / multiple wrappers each pay a fresh TCP+TLS handshake
+# (~150ms) on first use.  Keep-alive connections in a single pool make those
+# handshakes a one-time cost.
+
+_http_client: Optional[httpx.Client] = None
+# AsyncClient pools and their locks bind to the event loop they were created
+# on, and Flask's async views spin up a fresh loop per request — so async
+# clients are cached per loop, not per process.  Weak keys let an entry die
+# with its loop; a persistent loop (the batch client's dispatcher thread)
+# keeps one warm pool for its lifetime.
+_async_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_lock = threading.Lock()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=20,
+        max_keepalive_connections=10,
+        keepalive_expiry=60.0,
+    )
+
+
+def get_http_client() -> httpx.Client:
+    """Return the shared keep-alive httpx.Client, creating it on first use."""
+    global _http_client
+    if _http_client is None:
+        with _lock:
+            if _http_client is None:
+                timeout_s = int(os.getenv("LLM_TIMEOUT_SECONDS", "180"))
+                _http_client = httpx.Client(limits=_limits(), timeout=timeout_s)
+    return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Return the AsyncClient for the running event loop, creating it on
+    first use.  Must be called from within a coroutine."""
+    loop = asyncio.get_running_loop()
+    client = _async_http_clients.get(loop)
+    if client is None:
+        with _lock:
+            client = _async_http_clients.get(loop)
+            if client is None:
+                timeout_s = int(os.getenv("LLM_TIMEOUT_SECONDS", "180"))
+                client = httpx.AsyncClient(limits=_limits(), timeout=timeout_s)
+                _async_http_clients[loop] = client
+    return client